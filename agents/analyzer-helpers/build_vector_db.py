@@ -24,6 +24,7 @@ def main(
     csv: Path,
     db_dir: Optional[Path] = None,
     model: str = "sentence-transformers/all-MiniLM-L6-v2",
+    batch_size: int = 64,
 ) -> None:
     db_dir = db_dir or DEFAULT_DB_DIR
     # incidents_cache
@@ -34,6 +35,7 @@ def main(
         id_column="id" if False else None,  # plug if you add a stable id column later
         db_dir=db_dir,
         model_name=model,
+        batch_size=batch_size,
     )
 
     # problems_cache (optional)
@@ -45,6 +47,7 @@ def main(
             id_column="id" if False else None,
             db_dir=db_dir,
             model_name=model,
+            batch_size=batch_size,
         )
     except Exception:
         # Column may not exist in early datasets; skip gracefully
@@ -65,5 +68,8 @@ if __name__ == "__main__":  # pragma: no cover
         default="sentence-transformers/all-MiniLM-L6-v2",
         help="SentenceTransformer model name",
     )
+    p.add_argument(
+        "--batch-size", type=int, default=64, help="Embedding minibatch size"
+    )
     args = p.parse_args()
-    main(args.csv, args.db_dir, args.model)
+    main(args.csv, args.db_dir, args.model, args.batch_size)
@@ -6,7 +6,9 @@ Given an incident report string, check for near-duplicates in a Chroma collectio
 and return the associated root cause from row metadata. This replaces the earlier
 spaCy/CSV similarity implementation. For compatibility, the public API remains the
 same, and the function will fall back to the CSV method if the vector DB is not
-available.
+available. The CSV fallback embeds every row once per dataset load with the same
+MiniLM embedder and scores a query with a single matrix-vector product; spaCy is
+only used when the embedder cannot be imported.
 
 Collections expected (built by build_vector_db.py):
 - incidents_cache: embeddings of the 'Incident_Report' column of consolidated_incidents.csv
@@ -18,9 +20,19 @@ data/processed-data/consolidated_incidents.csv (relative to this file).
 
 from __future__ import annotations
 
+import csv
+import functools
+import hashlib
+import importlib.util
+import json
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -29,24 +41,61 @@ import pandas as pd
 try:
     from .vector_db_utils import (
         DEFAULT_DB_DIR,
+        Embedder,
+        best_match_index,
         query_collection,
+        query_collection_many,
+        warmup as _vdb_warmup,
     )
 
     _VDB_AVAILABLE = True
 except Exception:
+    Embedder = None  # type: ignore
     _VDB_AVAILABLE = False
 
-# Fallback spaCy utilities (kept for backward compatibility if Chroma not present)
-try:
-    import spacy
-except Exception:
-    spacy = None  # type: ignore
+
+# pyarrow parses the dataset CSV when installed (see _read_dataset_columns)
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+# pandas' default NA markers; pyarrow's defaults lack "None" and "<NA>"
+_PANDAS_NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
 
 
 # ---------------------------
 # spaCy model load utilities
 # ---------------------------
+# spaCy is only imported when the CSV fallback first needs it, so processes served
+# from Chroma never pay for the import or the model load.
 _NLP = None
+# Only the tokenizer and static word vectors are used; sentences are split by regex
+_SPACY_EXCLUDE = [
+    "tok2vec",
+    "tagger",
+    "parser",
+    "senter",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+]
 
 
 def _load_spacy():
@@ -54,9 +103,13 @@ def _load_spacy():
     if _NLP is not None:
         return _NLP
     try:
-        if spacy is None:  # pragma: no cover
-            raise RuntimeError("spaCy is not installed")
-        _NLP = spacy.load("en_core_web_md")
+        import spacy
+    except Exception as e:  # pragma: no cover
+        raise RuntimeError(
+            "spaCy is not installed. Install with `pip install spacy`."
+        ) from e
+    try:
+        _NLP = spacy.load("en_core_web_md", exclude=_SPACY_EXCLUDE)
     except OSError:
         # Try to download the medium model; if it fails, fall back to small
         try:
@@ -65,27 +118,57 @@ def _load_spacy():
             subprocess.run(
                 ["python", "-m", "spacy", "download", "en_core_web_md"], check=False
             )
-            _NLP = spacy.load("en_core_web_md")
+            _NLP = spacy.load("en_core_web_md", exclude=_SPACY_EXCLUDE)
         except Exception:
+            # sm ships no word vectors; its doc vectors need the tok2vec tensors
             _NLP = spacy.load("en_core_web_sm")
     return _NLP
 
 
 # ---------------------------
-# Text preprocessing and caches
+# Embedding model for the CSV fallback
 # ---------------------------
-_doc_cache: Dict[str, object] = {}
-_phrase_cache: Dict[str, List[str]] = {}
-_sim_cache: Dict[Tuple[str, str], float] = {}
+_EMBEDDER = None
 
 
-def _get_doc(text: str):
-    nlp = _load_spacy()
-    if text in _doc_cache:
-        return _doc_cache[text]
-    d = nlp(text)
-    _doc_cache[text] = d
-    return d
+def _get_embedder():
+    global _EMBEDDER
+    if _EMBEDDER is None:
+        if Embedder is None:  # pragma: no cover
+            raise RuntimeError("sentence-transformers embedder is not available")
+        _EMBEDDER = Embedder()
+    return _EMBEDDER
+
+
+# ---------------------------
+# Text preprocessing
+# ---------------------------
+# Longest phrases kept per text when building phrase matrices
+_MAX_PHRASES = 8
+# Texts per spaCy tokenizer batch in the vector fallback
+_PIPE_BATCH = 256
+# Sentence boundaries: whitespace after terminal punctuation
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+# Dates/times, IDs/ticket numbers and standalone numbers in one alternation.
+# Alternatives are tried left to right at each position, matching the order the
+# substitutions used to be applied in.
+_CLEAN_RE = re.compile(
+    r"(?P<date>\b\d{4}-\d{2}-\d{2}\b"  # 2025-10-18
+    r"|\b\d{1,2}[:/\-]\d{1,2}[:/\-]\d{2,4}\b)"  # 10/18/2025, 18-10-25
+    r"|(?P<time>\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AaPp][Mm])?\b)"  # 10:30, 10:30 AM
+    r"|(?P<id>\b[A-Z]{2,}\d+\b"  # INC123, REQ456, ALR-12345 (partial)
+    r"|\b\d{5,}\b"  # long numbers
+    r"|#\d+)"  # #12345
+    r"|(?P<num>(?<!\S)\d+(?!\S))"  # standalone numbers
+)
+_CLEAN_REPL = {"date": "[DATE]", "time": "[TIME]", "id": "[ID]", "num": " "}
+_WS_RE = re.compile(r"\s+")
+
+
+def _clean_repl(m: "re.Match[str]") -> str:
+    return _CLEAN_REPL[m.lastgroup]  # type: ignore[index]
 
 
 def clean_text(text: object) -> str:
@@ -96,90 +179,268 @@ def clean_text(text: object) -> str:
     """
     if text is None:
         return ""
-    s = str(text)
-
-    # Dates/times
-    s = re.sub(r"\b\d{4}-\d{2}-\d{2}\b", "[DATE]", s)  # 2025-10-18
-    s = re.sub(
-        r"\b\d{1,2}[:/\-]\d{1,2}[:/\-]\d{2,4}\b", "[DATE]", s
-    )  # 10/18/2025, 18-10-25
-    s = re.sub(
-        r"\b\d{1,2}:\d{2}(:\d{2})?(\s?[AaPp][Mm])?\b", "[TIME]", s
-    )  # 10:30, 10:30 AM
-
-    # IDs and ticket numbers
-    s = re.sub(r"\b[A-Z]{2,}\d+\b", "[ID]", s)  # INC123, REQ456, ALR-12345 (partial)
-    s = re.sub(r"\b\d{5,}\b", "[ID]", s)  # long numbers
-    s = re.sub(r"#\d+", "[ID]", s)  # #12345
-
-    # Standalone numbers
-    s = re.sub(r"\s\d+\s", " ", s)
-    s = re.sub(r"^\d+\s", "", s)
-    s = re.sub(r"\s\d+$", "", s)
+    text = str(text)
+    if len(text) > _CLEAN_CACHE_MAX_CHARS:
+        return _clean_uncached(text)
+    return _clean_str(text)
+
+
+# Only short strings are memoized: the cache key is the whole input, so caching
+# large uploads would keep every one of them (and its cleaned copy) alive.
+_CLEAN_CACHE_MAX_CHARS = 4096
+
+
+@functools.lru_cache(maxsize=131072)
+def _clean_str(text: str) -> str:
+    # Queries and reports repeat a lot, so results are memoized per string
+    return _clean_uncached(text)
+
+
+def _clean_uncached(text: str) -> str:
+    s = _CLEAN_RE.sub(_clean_repl, text)
 
     # Normalize whitespace and case
-    s = re.sub(r"\s+", " ", s).strip()
-    return s.lower()
+    return _WS_RE.sub(" ", s).strip().lower()
+
+
+def clean_text_bulk(texts: List[object]) -> List[str]:
+    """clean_text over a list, for dataset loads.
+
+    Binds the regex methods once and cleans each distinct input only once, which
+    matters for incident exports where templated reports repeat.
+    """
+    sub = _CLEAN_RE.sub
+    ws_sub = _WS_RE.sub
+    seen: Dict[object, str] = {}
+    out: List[str] = []
+    append = out.append
+    for text in texts:
+        c = seen.get(text)
+        if c is None:
+            c = "" if text is None else ws_sub(" ", sub(_clean_repl, str(text)))
+            c = c.strip().lower()
+            seen[text] = c
+        append(c)
+    return out
 
 
 def get_phrases(cleaned_text: str) -> List[str]:
-    """Split cleaned text into meaningful phrases (sentences). Cached."""
+    """Split cleaned text into meaningful phrases (sentences)."""
     if not cleaned_text:
         return []
-    if cleaned_text in _phrase_cache:
-        return _phrase_cache[cleaned_text]
-    doc = _get_doc(cleaned_text)
+    if "." not in cleaned_text and "!" not in cleaned_text and "?" not in cleaned_text:
+        # Single sentence (most incident lines): no split needed
+        phrase = cleaned_text.strip()
+        return [phrase] if len(phrase.split(None, 1)) >= 2 else []
     phrases: List[str] = []
-    for sent in doc.sents:
-        phrase = sent.text.strip()
-        if len(phrase.split()) >= 2:
+    for sent in _SENT_SPLIT_RE.split(cleaned_text):
+        phrase = sent.strip()
+        # Multi-word phrases only; maxsplit=1 is enough to tell
+        if len(phrase.split(None, 1)) >= 2:
             phrases.append(phrase)
-    _phrase_cache[cleaned_text] = phrases
     return phrases
 
 
-def calculate_phrase_similarity(a: str, b: str) -> float:
-    """Average best-match phrase similarity between two texts (0..1).
+def _default_phrase_backend() -> str:
+    """Phrase backend for standalone use: MiniLM if it imports, else spaCy."""
+    return "minilm" if Embedder is not None else "spacy"
 
-    - Clean inputs
-    - Split into sentences (phrases)
-    - For each phrase in A, take max similarity with any phrase in B
-    - Average those maxima
-    - Cache by cleaned pair (order-independent)
+
+def _phrase_matrix(cleaned_text: str) -> np.ndarray:
+    """L2-normalized (P, dim) float32 matrix of a text's longest phrases.
+
+    Uses the MiniLM embedder when available and spaCy phrase vectors otherwise.
+    Texts without a multi-word phrase are embedded whole.
     """
-    ca = clean_text(a)
-    cb = clean_text(b)
-    if not ca or not cb:
+    return _phrase_matrices([cleaned_text], _default_phrase_backend())[0]
+
+
+def _phrase_matrices(cleaned_texts: List[str], backend: str) -> List[np.ndarray]:
+    """_phrase_matrix for many texts, embedding all selected phrases in one pass.
+
+    backend is "minilm" or "spacy"; the dataset fallback passes "spacy" so it
+    never goes back to an embedder that just failed to load.
+    """
+    present = [i for i, t in enumerate(cleaned_texts) if t]
+    selected: List[List[str]] = []
+    for i in present:
+        phrases = sorted(get_phrases(cleaned_texts[i]), key=len, reverse=True)
+        selected.append(phrases[:_MAX_PHRASES] or [cleaned_texts[i]])
+    flat = [p for phrases in selected for p in phrases]
+    if not flat:
+        vecs = np.zeros((0, 0), dtype=np.float32)
+    elif backend == "minilm":
+        vecs = np.asarray(_get_embedder().encode(flat), dtype=np.float32)
+    else:
+        # Doc vectors come from the static word vectors, so tokenizing suffices
+        nlp = _load_spacy()
+        pipe = nlp.tokenizer.pipe if len(nlp.vocab.vectors) else nlp.pipe
+        vecs = np.asarray(
+            [d.vector for d in pipe(flat, batch_size=_PIPE_BATCH)],
+            dtype=np.float32,
+        )
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        vecs = vecs / np.maximum(norms, 1e-12)
+    out = [np.zeros((0, 0), dtype=np.float32)] * len(cleaned_texts)
+    start = 0
+    for i, phrases in zip(present, selected):
+        out[i] = vecs[start : start + len(phrases)]
+        start += len(phrases)
+    return out
+
+
+def _phrase_matrix_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean over rows of `a` of the best cosine match among rows of `b`."""
+    if not len(a) or not len(b):
         return 0.0
+    return float((a @ b.T).max(axis=1).mean())
+
+
+def _stack_phrase_matrices(
+    mats: List[np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate per-text phrase matrices CSR-style.
+
+    Returns (matrix, offsets): rows offsets[i]:offsets[i+1] belong to text i.
+    """
+    offsets = np.zeros(len(mats) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(m) for m in mats])
+    nonempty = [m for m in mats if len(m)]
+    if not nonempty:
+        return np.zeros((0, 0), dtype=np.float32), offsets
+    return np.ascontiguousarray(np.vstack(nonempty), dtype=np.float32), offsets
+
+
+def _segment_phrase_scores(
+    q_mat: np.ndarray,
+    q_offsets: np.ndarray,
+    mat: np.ndarray,
+    offsets: np.ndarray,
+) -> np.ndarray:
+    """Phrase similarity of every query text against every dataset text.
+
+    Equivalent to _phrase_matrix_similarity for each (query, row) pair, but
+    computed with one matrix product over all phrases and segment reductions:
+    max over each row's phrases, then mean over each query's phrases. Pairs where
+    either side has no phrases score 0.
+    """
+    n_q, n_rows = len(q_offsets) - 1, len(offsets) - 1
+    scores = np.zeros((n_q, n_rows), dtype=np.float32)
+    q_len = np.diff(q_offsets)
+    r_len = np.diff(offsets)
+    if not len(q_mat) or not len(mat):
+        return scores
+    sims = q_mat @ mat.T  # (query phrases, dataset phrases)
+    r_has = r_len > 0
+    # reduceat needs in-range starts; empty segments are masked out afterwards
+    best = np.maximum.reduceat(sims, offsets[:-1][r_has], axis=1)
+    q_has = q_len > 0
+    sums = np.add.reduceat(best, q_offsets[:-1][q_has], axis=0)
+    scores[np.ix_(q_has, r_has)] = sums / q_len[q_has][:, None]
+    return scores
+
+
+def _quantize_phrase_matrix(
+    mat: np.ndarray, offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """int8 copy of a phrase matrix with per-phrase absmax scales.
+
+    Returns (q, scale, row_err): mat ~= q * scale[:, None], and row_err[i] is
+    the largest L2 dequantization error among dataset text i's phrases. For a
+    unit query phrase that bounds how far each row's score can move.
+    """
+    absmax = np.abs(mat).max(axis=1) if len(mat) else np.zeros(0, np.float32)
+    scale = (np.maximum(absmax, 1e-12) / 127.0).astype(np.float32)
+    q = np.rint(mat / scale[:, None]).astype(np.int8)
+    err = np.linalg.norm(mat - q.astype(np.float32) * scale[:, None], axis=1)
+    row_err = np.zeros(len(offsets) - 1, dtype=np.float32)
+    r_has = np.diff(offsets) > 0
+    if r_has.any():
+        row_err[r_has] = np.maximum.reduceat(err, offsets[:-1][r_has])
+    return q, scale, row_err
+
+
+@functools.lru_cache(maxsize=1)
+def _score_pool() -> Optional[ThreadPoolExecutor]:
+    workers = os.cpu_count() or 1
+    if workers < 2:
+        return None
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phrase-score")
+
 
-    # Order-independent cache key
-    key = (ca, cb) if ca <= cb else (cb, ca)
-    if key in _sim_cache:
-        return _sim_cache[key]
+def _blocked_phrase_scores(
+    q_mat: np.ndarray,
+    q_offsets: np.ndarray,
+    offsets: np.ndarray,
+    tile: Callable[[int, int], np.ndarray],
+) -> np.ndarray:
+    """_segment_phrase_scores over blocks of about _SCORE_BLOCK dataset phrases.
 
-    p1 = get_phrases(ca)
-    p2 = get_phrases(cb)
+    tile(a, b) returns phrases a:b as float32. Blocks fill disjoint columns, so
+    on large datasets they run on a thread pool: NumPy releases the GIL in the
+    matmul and the segment reductions, and threads share the matrix as is.
+    """
+    n_rows = len(offsets) - 1
+    scores = np.zeros((len(q_offsets) - 1, n_rows), dtype=np.float32)
+    bounds = [0]
+    while bounds[-1] < n_rows:
+        r0 = bounds[-1]
+        # Rows up to roughly _SCORE_BLOCK phrases, at least one row per block
+        stop = np.searchsorted(offsets, offsets[r0] + _SCORE_BLOCK, side="right") - 1
+        bounds.append(min(max(int(stop), r0 + 1), n_rows))
+
+    def run(r0: int, r1: int) -> None:
+        a, b = offsets[r0], offsets[r1]
+        scores[:, r0:r1] = _segment_phrase_scores(
+            q_mat, q_offsets, tile(a, b), offsets[r0 : r1 + 1] - a
+        )
+
+    blocks = list(zip(bounds[:-1], bounds[1:]))
+    pool = _score_pool() if n_rows >= _PARALLEL_MIN_ROWS else None
+    if pool is None or len(blocks) < 2:
+        for r0, r1 in blocks:
+            run(r0, r1)
+    else:
+        list(pool.map(lambda blk: run(*blk), blocks))
+    return scores
+
+
+def _quantized_phrase_scores(
+    q_mat: np.ndarray,
+    q_offsets: np.ndarray,
+    q8: np.ndarray,
+    scale: np.ndarray,
+    offsets: np.ndarray,
+) -> np.ndarray:
+    """_segment_phrase_scores against the int8 matrix, one block at a time.
+
+    Each block is dequantized into a float32 tile, so the scan streams a quarter
+    of the float32 bytes.
+    """
+
+    def dequantize(a: int, b: int) -> np.ndarray:
+        tile = q8[a:b].astype(np.float32)
+        tile *= scale[a:b, None]
+        return tile
 
-    if not p1 or not p2:
-        d1 = _get_doc(ca)
-        d2 = _get_doc(cb)
-        sim = float(d1.similarity(d2))
-        _sim_cache[key] = sim
-        return sim
+    return _blocked_phrase_scores(q_mat, q_offsets, offsets, dequantize)
 
-    sims: List[float] = []
-    for s1 in p1:
-        d1 = _get_doc(s1)
-        best = 0.0
-        for s2 in p2:
-            d2 = _get_doc(s2)
-            best = max(best, float(d1.similarity(d2)))
-        if best:
-            sims.append(best)
 
-    avg = float(np.mean(sims)) if sims else 0.0
-    _sim_cache[key] = avg
-    return avg
+def calculate_phrase_similarity(a: str, b: str, already_clean: bool = False) -> float:
+    """Average best-match phrase similarity between two texts (0..1).
+
+    - Clean inputs (skipped with already_clean, e.g. for dataset `_clean` values)
+    - Split into sentences (phrases) and embed them
+    - For each phrase in A, take max similarity with any phrase in B
+    - Average those maxima (one matrix product)
+    """
+    ca = a if already_clean else clean_text(a)
+    cb = b if already_clean else clean_text(b)
+    if not ca or not cb:
+        return 0.0
+    return _phrase_matrix_similarity(
+        *_phrase_matrices([ca, cb], _default_phrase_backend())
+    )
 
 
 # ---------------------------
@@ -188,9 +449,32 @@ def calculate_phrase_similarity(a: str, b: str) -> float:
 _dataset_cache = {
     "path": None,  # type: Optional[Path]
     "mtime": None,  # type: Optional[float]
-    "rows": None,  # type: Optional[List[Dict[str, str]]]
+    # Columnar rows: parallel lists aligned with the matrices below
+    "report": None,  # type: Optional[List[str]]
+    "cause": None,  # type: Optional[List[str]]
+    "clean": None,  # type: Optional[List[str]]
+    "emb": None,  # type: Optional[np.ndarray]
+    # spaCy fallback: stacked row phrase vectors and CSR offsets
+    "phrases": None,  # type: Optional[Tuple[np.ndarray, np.ndarray]]
+    # int8 copy of "phrases" (see _quantize_phrase_matrix), large datasets only
+    "phrases_q": None,  # type: Optional[Tuple[np.ndarray, ...]]
+    # Leader clusters over "emb" (see _leader_clusters), large datasets only
+    "clusters": None,  # type: Optional[Tuple[np.ndarray, ...]]
 }
 
+# Phrase matrices at least this large are also kept as int8 for scanning
+_INT8_MIN_PHRASES = 16384
+# Phrase scans run in tiles of this many phrases, spread over threads from
+# _PARALLEL_MIN_ROWS dataset rows on
+_SCORE_BLOCK = 4096
+_PARALLEL_MIN_ROWS = 5000
+
+# Leaders absorb rows within this cosine; below _CLUSTER_MIN_ROWS a full scan
+# is a single small matmul and pruning would not pay for itself.
+_CLUSTER_COS = 0.86
+_CLUSTER_MIN_ROWS = 4096
+_CLUSTER_BLOCK = 256
+
 
 def _default_csv_path() -> Path:
     return (
@@ -198,12 +482,219 @@ def _default_csv_path() -> Path:
     ).resolve()
 
 
+def _load_or_build_embeddings(path: Path, mtime: float, texts: List[str]) -> np.ndarray:
+    """Return the embedding matrix for `texts`, reusing an on-disk sidecar.
+
+    The matrix is saved next to the CSV as <name>.emb.npy with a small
+    <name>.emb.meta.json recording the CSV mtime, row count and model name. When
+    those still match, the matrix is memory-mapped instead of re-encoded.
+    """
+    emb_path = path.with_suffix(".emb.npy")
+    meta_path = path.with_suffix(".emb.meta.json")
+    model_name = _get_embedder().model_name
+    expected = {"mtime": mtime, "n": len(texts), "model": model_name}
+    try:
+        if emb_path.exists() and json.loads(meta_path.read_text()) == expected:
+            return np.load(emb_path, mmap_mode="r")
+    except Exception:
+        pass
+
+    emb = np.asarray(_get_embedder().encode(texts), dtype=np.float32)
+    try:
+        np.save(emb_path, emb)
+        meta_path.write_text(json.dumps(expected))
+    except OSError:
+        # Read-only data dir: keep the in-memory matrix only
+        pass
+    return emb
+
+
+def _leader_clusters(
+    emb: np.ndarray, min_cos: float = _CLUSTER_COS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Greedy leader clustering of L2-normalized rows.
+
+    Each row joins the most similar existing leader with cosine >= min_cos or
+    becomes a new leader. Returns (leaders (K, dim), radii (K,) as the largest
+    member angle to its leader in radians, member row indices grouped by
+    cluster, CSR offsets (K+1,)).
+    """
+    n = len(emb)
+    assign = np.empty(n, dtype=np.int64)
+    leaders = np.empty_like(emb, dtype=np.float32)
+    k = 0
+    for s in range(0, n, _CLUSTER_BLOCK):
+        blk = np.asarray(emb[s : s + _CLUSTER_BLOCK], dtype=np.float32)
+        # Leaders that existed before the block are matched in one product;
+        # rows left over are checked against the leaders the block creates.
+        k0 = k
+        if k0:
+            sims = blk @ leaders[:k0].T
+            best = sims.argmax(axis=1)
+            ok = sims[np.arange(len(blk)), best] >= min_cos
+        else:
+            best = np.zeros(len(blk), dtype=np.int64)
+            ok = np.zeros(len(blk), dtype=bool)
+        for off in range(len(blk)):
+            if ok[off]:
+                assign[s + off] = best[off]
+                continue
+            if k > k0:
+                new_sims = leaders[k0:k] @ blk[off]
+                j = int(new_sims.argmax())
+                if new_sims[j] >= min_cos:
+                    assign[s + off] = k0 + j
+                    continue
+            leaders[k] = blk[off]
+            assign[s + off] = k
+            k += 1
+    leaders = leaders[:k].copy()
+
+    member_cos = np.einsum(
+        "ij,ij->i", np.asarray(emb, dtype=np.float32), leaders[assign]
+    )
+    min_member_cos = np.ones(k, dtype=np.float32)
+    np.minimum.at(min_member_cos, assign, member_cos)
+    radii = np.arccos(np.clip(min_member_cos, -1.0, 1.0))
+    order = np.argsort(assign, kind="stable")
+    offsets = np.zeros(k + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assign, minlength=k), out=offsets[1:])
+    return leaders, radii, order, offsets
+
+
+def _cluster_candidates(
+    clusters: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    q: np.ndarray,
+    similarity_threshold: float,
+) -> np.ndarray:
+    """Sorted row indices that can reach similarity_threshold against unit `q`.
+
+    A member's angle to q is at least angle(q, leader) - radius, so clusters
+    failing that bound are skipped without changing the best match.
+    """
+    leaders, radii, order, offsets = clusters
+    angles = np.arccos(np.clip(leaders @ q, -1.0, 1.0))
+    limit = np.arccos(np.clip(similarity_threshold, -1.0, 1.0)) + 1e-4
+    hit = np.flatnonzero(angles - radii <= limit)
+    if not len(hit):
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.concatenate([order[offsets[c] : offsets[c + 1]] for c in hit]))
+
+
+def _phrase_backend_model(backend: str) -> str:
+    """Cache key for the vectors `backend` produces; only that backend is loaded."""
+    if backend == "spacy":
+        meta = _load_spacy().meta
+        name = f"spacy:{meta.get('lang', '')}_{meta.get('name', '')}"
+    else:
+        name = f"{backend}:{_get_embedder().model_name}"
+    # The suffix versions the phrase splitting, which also shapes the matrix
+    return name + "+re-sents"
+
+
+def _load_or_build_phrase_matrix(
+    path: Path, mtime: float, texts: List[str], backend: str = "spacy"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the stacked phrase vectors and offsets for `texts`.
+
+    Saved next to the CSV as <name>.vec-cache.npz together with the CSV mtime,
+    row count and the backend and model that produced the vectors, so warm
+    starts skip tokenizing the dataset and never reuse another backend's matrix.
+    """
+    cache_path = path.with_suffix(".vec-cache.npz")
+    model = _phrase_backend_model(backend)
+    try:
+        if cache_path.exists():
+            with np.load(cache_path, allow_pickle=False) as z:
+                if (
+                    float(z["mtime"]) == mtime
+                    and int(z["n"]) == len(texts)
+                    and str(z["model"]) == model
+                ):
+                    return z["matrix"], z["offsets"]
+    except Exception:
+        pass
+
+    matrix, offsets = _stack_phrase_matrices(_phrase_matrices(texts, backend))
+    try:
+        np.savez(
+            cache_path,
+            matrix=matrix,
+            offsets=offsets,
+            mtime=np.float64(mtime),
+            n=np.int64(len(texts)),
+            model=np.str_(model),
+        )
+    except OSError:
+        # Read-only data dir: keep the in-memory matrix only
+        pass
+    return matrix, offsets
+
+
+_DATASET_COLUMNS = ["Incident_Report", "Root_Cause"]
+
+
+def _read_dataset_columns(path: Path) -> Tuple[List[str], List[str]]:
+    """Stripped (reports, root causes) of rows where both are non-empty.
+
+    Only the two columns are parsed. pyarrow's multithreaded reader is used when
+    installed, pandas otherwise (and for files pyarrow rejects, e.g. short rows,
+    which pandas pads with NaN).
+    """
+    # Validate required columns from the header alone; utf-8-sig drops the BOM
+    # of Excel "CSV UTF-8" exports
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    missing = set(_DATASET_COLUMNS) - set(header)
+    if missing:
+        raise ValueError(f"CSV missing required columns: {missing}")
+
+    if _HAS_PYARROW:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+
+        try:
+            table = pacsv.read_csv(
+                path,
+                read_options=pacsv.ReadOptions(use_threads=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=_DATASET_COLUMNS,
+                    column_types={c: pa.string() for c in _DATASET_COLUMNS},
+                    # Treat NA/null markers in text columns as missing, like pandas
+                    null_values=_PANDAS_NA_VALUES,
+                    strings_can_be_null=True,
+                ),
+            )
+        except pa.ArrowInvalid:
+            table = None
+        if table is not None:
+            ir = pc.utf8_trim_whitespace(table.column("Incident_Report"))
+            rc = pc.utf8_trim_whitespace(table.column("Root_Cause"))
+            keep = pc.and_(
+                pc.fill_null(pc.not_equal(ir, ""), False),
+                pc.fill_null(pc.not_equal(rc, ""), False),
+            )
+            return ir.filter(keep).to_pylist(), rc.filter(keep).to_pylist()
+
+    df = pd.read_csv(path, encoding="utf-8", usecols=_DATASET_COLUMNS)
+    # Drop null/empty
+    df = df.dropna(subset=_DATASET_COLUMNS)
+    irs = df["Incident_Report"].astype(str).str.strip()
+    rcs = df["Root_Cause"].astype(str).str.strip()
+    keep = (irs != "") & (rcs != "")
+    return irs[keep].tolist(), rcs[keep].tolist()
+
+
 def _load_dataset(
     csv_path: Optional[Path] = None,
-) -> Tuple[List[Dict[str, str]], float]:
+) -> Tuple[List[str], float]:
     """Load consolidated CSV into memory with mtime for cache invalidation.
 
-    Returns (rows, mtime). Each row contains keys: 'Incident_Report', 'Root_Cause'.
+    Returns (root_causes, mtime). Rows are kept column-wise in _dataset_cache as
+    parallel "report", "cause" and "clean" (cleaned report) lists. When the
+    embedder is available, the L2-normalized (N, dim) float32 embedding matrix of
+    the cleaned reports is cached alongside as _dataset_cache["emb"].
     """
     path = Path(csv_path) if csv_path is not None else _default_csv_path()
     if not path.exists():
@@ -213,47 +704,287 @@ def _load_dataset(
     if (
         _dataset_cache["path"] == path
         and _dataset_cache["mtime"] == mtime
-        and _dataset_cache["rows"] is not None
+        and _dataset_cache["cause"] is not None
     ):
-        return _dataset_cache["rows"], mtime
+        return _dataset_cache["cause"], mtime
 
-    df = pd.read_csv(path, encoding="utf-8")
+    try:
+        irs, rcs = _read_dataset_columns(path)
+    except (OSError, ValueError):
+        # Half-written or broken export: keep serving the last good load of this
+        # file; the next call retries the parse. (pyarrow errors are ValueErrors.)
+        if _dataset_cache["path"] == path and _dataset_cache["cause"] is not None:
+            return _dataset_cache["cause"], _dataset_cache["mtime"]
+        raise
 
-    # Validate required columns
-    expected_cols = {"Incident_Report", "Root_Cause"}
-    missing = expected_cols - set(df.columns)
-    if missing:
-        raise ValueError(f"CSV missing required columns: {missing}")
+    # Precompute cleaned text for faster comparisons
+    cleans = clean_text_bulk(irs)
 
-    # Drop null/empty
-    df = df.dropna(subset=["Incident_Report", "Root_Cause"]).copy()
-    df["Incident_Report"] = df["Incident_Report"].astype(str).str.strip()
-    df["Root_Cause"] = df["Root_Cause"].astype(str).str.strip()
-    df = df[(df["Incident_Report"] != "") & (df["Root_Cause"] != "")]
+    # Embed all cleaned rows in one batched call; rows stay aligned with matrix rows
+    emb: Optional[np.ndarray] = None
+    if Embedder is not None and cleans:
+        try:
+            emb = _load_or_build_embeddings(path, mtime, cleans)
+        except Exception:
+            emb = None
+    clusters = None
+    if emb is not None and len(emb) >= _CLUSTER_MIN_ROWS:
+        clusters = _leader_clusters(emb)
+    phrases = None
+    if emb is None:
+        # Phrase-level fallback: every row's phrase vectors in one stacked matrix
+        phrases = _load_or_build_phrase_matrix(path, mtime, cleans, "spacy")
+    phrases_q = None
+    if phrases is not None and len(phrases[0]) >= _INT8_MIN_PHRASES:
+        phrases_q = _quantize_phrase_matrix(*phrases)
+
+    _dataset_cache.update(
+        {
+            "path": path,
+            "mtime": mtime,
+            "report": irs,
+            "cause": rcs,
+            "clean": cleans,
+            "emb": emb,
+            "phrases": phrases,
+            "phrases_q": phrases_q,
+            "clusters": clusters,
+        }
+    )
+    return rcs, mtime
 
-    # Precompute cleaned text for faster comparisons
-    rows: List[Dict[str, str]] = []
-    for _, r in df.iterrows():
-        ir = r["Incident_Report"]
-        rc = r["Root_Cause"]
-        cleaned = clean_text(ir)
-        rows.append(
-            {
-                "Incident_Report": ir,
-                "Root_Cause": rc,
-                "_clean": cleaned,
-                # phrases will be computed lazily via get_phrases cache
-            }
-        )
 
-    _dataset_cache.update({"path": path, "mtime": mtime, "rows": rows})
-    return rows, mtime
+# ---------------------------
+# Background warmup
+# ---------------------------
+_warmup_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def _warmup(csv_path: Optional[Path]) -> None:
+    if _VDB_AVAILABLE:
+        try:
+            # The Chroma path's client and query model
+            _vdb_warmup(("incidents_cache",), db_dir=DEFAULT_DB_DIR)
+        except Exception:
+            _vdb_back_off()
+    try:
+        # Loads the embedder (or spaCy) along with the dataset matrices
+        _load_dataset(csv_path)
+    except Exception:
+        # Queries after warmup load synchronously and surface the error
+        pass
+
+
+def kick_warmup(csv_path: Optional[Path | str] = None) -> threading.Thread:
+    """Load the CSV fallback dataset and its model on a daemon thread.
+
+    Meant for servers at startup: while the warmup runs, lookups skip the
+    vector DB and report a CSV-fallback miss (None) instead of blocking the
+    request on the cold loads.
+    Calling it again while a warmup is running returns the running thread.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            _warmup_thread = threading.Thread(
+                target=_warmup,
+                args=(Path(csv_path) if csv_path is not None else None,),
+                name="cache-requests-warmup",
+                daemon=True,
+            )
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def _warming_up() -> bool:
+    t = _warmup_thread
+    return t is not None and t.is_alive()
+
+
+# After a failed Chroma query (e.g. model weights that can't load offline) the
+# vector DB path is skipped for _VDB_RETRY_S instead of retried on every lookup
+_VDB_RETRY_S = 60.0
+_vdb_retry_at = 0.0
+
+
+def _vdb_back_off() -> None:
+    global _vdb_retry_at
+    _vdb_retry_at = time.monotonic() + _VDB_RETRY_S
+
+
+def _use_vdb() -> bool:
+    return _VDB_AVAILABLE and not _warming_up() and time.monotonic() >= _vdb_retry_at
 
 
 # ---------------------------
 # Query result cache
 # ---------------------------
-_query_result_cache: Dict[Tuple[str, float, float], Optional[str]] = {}
+class _LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry past maxsize."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[object, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._data),
+        }
+
+
+_MISS = object()
+# Keyed by a 16-byte digest of the cleaned text rather than the text itself, so
+# long reports are not kept alive by the cache; bounded for long-running servers.
+_query_result_cache = _LRUCache(maxsize=50_000)
+
+
+def _query_key(
+    cleaned: str, similarity_threshold: float, mtime: float
+) -> Tuple[bytes, float, float]:
+    digest = hashlib.blake2b(cleaned.encode("utf-8"), digest_size=16).digest()
+    return digest, float(similarity_threshold), float(mtime)
+
+
+def _best_vdb_cause(
+    distances: List[Optional[float]],
+    metas: List[Dict[str, object]],
+    similarity_threshold: float,
+) -> Optional[str]:
+    """Pick the Root_Cause of the closest Chroma hit at or above the threshold."""
+    best = best_match_index(distances, similarity_threshold)
+    if best is None:
+        return None
+    meta = metas[best]
+    # Expect Root_Cause in metadata; if missing, try to be resilient
+    rc = meta.get("Root_Cause") if isinstance(meta, dict) else None
+    return str(rc) if rc is not None else None
+
+
+def _csv_fallback_causes(
+    cleaned_reports: List[str],
+    csv_path: Optional[Path | str],
+    similarity_threshold: float,
+) -> List[Optional[str]]:
+    """Match cleaned reports against the CSV dataset (embedding matrix or spaCy)."""
+    if _warming_up():
+        # Cold load in progress: report misses without caching them
+        return [None] * len(cleaned_reports)
+    causes, mtime = _load_dataset(Path(csv_path) if csv_path is not None else None)
+
+    out: List[Optional[str]] = [None] * len(cleaned_reports)
+    todo: List[int] = []
+    keys = [_query_key(c, similarity_threshold, mtime) for c in cleaned_reports]
+    for i, cache_key in enumerate(keys):
+        cached = _query_result_cache.get(cache_key, _MISS)
+        if cached is _MISS:
+            todo.append(i)
+        else:
+            out[i] = cached
+    if not todo:
+        return out
+
+    emb = _dataset_cache["emb"]
+    if emb is not None and len(causes):
+        # Both sides are L2-normalized, so the dot products are cosine similarities
+        q = np.asarray(
+            _get_embedder().encode([cleaned_reports[i] for i in todo]),
+            dtype=np.float32,
+        )
+        clusters = _dataset_cache["clusters"]
+        if clusters is not None:
+            # Score only members of clusters whose bound admits the threshold
+            for j, i in enumerate(todo):
+                cand = _cluster_candidates(clusters, q[j], similarity_threshold)
+                if not len(cand):
+                    continue
+                sims = emb[cand] @ q[j]
+                k = int(sims.argmax())
+                if sims[k] >= similarity_threshold:
+                    out[i] = causes[int(cand[k])]
+        else:
+            sims = q @ emb.T
+            best = sims.argmax(axis=1)
+            for j, i in enumerate(todo):
+                idx = int(best[j])
+                if sims[j, idx] >= similarity_threshold:
+                    out[i] = causes[idx]
+    elif len(causes):
+        mat, offsets = _dataset_cache["phrases"]
+        # Same backend as the dataset phrase matrix
+        q_mat, q_offsets = _stack_phrase_matrices(
+            _phrase_matrices([cleaned_reports[i] for i in todo], "spacy")
+        )
+        phrases_q = _dataset_cache["phrases_q"]
+        if phrases_q is not None:
+            # Screen on the int8 copy; a row's true score is within row_err of
+            # its screened one, so only rows that can reach the threshold are
+            # rescored in float32 and the result matches the full scan.
+            q8, scale, row_err = phrases_q
+            approx = _quantized_phrase_scores(q_mat, q_offsets, q8, scale, offsets)
+            for j, i in enumerate(todo):
+                cand = np.flatnonzero(approx[j] + row_err >= similarity_threshold)
+                if not len(cand):
+                    continue
+                starts, stops = offsets[cand], offsets[cand + 1]
+                sub = np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+                sub_offsets = np.zeros(len(cand) + 1, dtype=np.int64)
+                np.cumsum(stops - starts, out=sub_offsets[1:])
+                qa, qb = q_offsets[j], q_offsets[j + 1]
+                exact = _segment_phrase_scores(
+                    q_mat[qa:qb],
+                    np.array([0, qb - qa], dtype=np.int64),
+                    mat[sub],
+                    sub_offsets,
+                )[0]
+                k = int(exact.argmax())
+                if exact[k] >= similarity_threshold:
+                    out[i] = causes[int(cand[k])]
+        else:
+            scores = _blocked_phrase_scores(
+                q_mat, q_offsets, offsets, lambda a, b: mat[a:b]
+            )
+            best = scores.argmax(axis=1)
+            for j, i in enumerate(todo):
+                idx = int(best[j])
+                if scores[j, idx] >= similarity_threshold:
+                    out[i] = causes[idx]
+
+    for i in todo:
+        _query_result_cache[keys[i]] = out[i]
+    return out
 
 
 def get_root_cause_for_incident(
@@ -264,15 +995,16 @@ def get_root_cause_for_incident(
     """Return the root cause for a given incident by semantic match or None.
 
     Preferred path: Query Chroma collection 'incidents_cache' and accept a hit
-    if cosine distance implies similarity >= threshold. Fallback path: CSV+spaCy
-    phrase similarity (legacy). The threshold is interpreted the same way for both
-    paths as a similarity in [0,1].
+    if cosine distance implies similarity >= threshold. Fallback path: cosine
+    similarity against the cached CSV embedding matrix (spaCy phrase similarity
+    if no embedder is installed). The threshold is interpreted the same way for
+    all paths as a similarity in [0,1].
     """
     if incident_report is None or str(incident_report).strip() == "":
         return None
 
     # Try vector DB first
-    if _VDB_AVAILABLE:
+    if _use_vdb():
         try:
             # Query the collection
             result = query_collection(
@@ -281,61 +1013,87 @@ def get_root_cause_for_incident(
                 k=5,
                 db_dir=DEFAULT_DB_DIR,
             )
-
-            # Chroma returns distances (smaller is closer). We used normalized embeddings,
-            # which makes cosine distance = 1 - cosine similarity.
             distances = result.get("distances", [[]])[0] if result else []
             metas = result.get("metadatas", [[]])[0] if result else []
-
-            best_match_cause: Optional[str] = None
-            best_sim = -1.0
-            for dist, meta in zip(distances, metas):
-                if dist is None:
-                    continue
-                sim = 1.0 - float(dist)
-                if sim >= similarity_threshold and sim > best_sim:
-                    best_sim = sim
-                    # Expect Root_Cause in metadata; if missing, try to be resilient
-                    rc = meta.get("Root_Cause") if isinstance(meta, dict) else None
-                    best_match_cause = str(rc) if rc is not None else None
+            best_match_cause = _best_vdb_cause(distances, metas, similarity_threshold)
 
             # Cache by current dataset mtime surrogate: use 0.0 because Chroma persists
             cleaned_incident = clean_text(incident_report)
-            cache_key = (cleaned_incident, float(similarity_threshold), 0.0)
+            cache_key = _query_key(cleaned_incident, similarity_threshold, 0.0)
             _query_result_cache[cache_key] = best_match_cause
             if best_match_cause is not None:
                 return best_match_cause
         except Exception:
             # Fall through to CSV fallback
-            pass
-
-    # Fallback to legacy CSV+spaCy
-    rows, mtime = _load_dataset(Path(csv_path) if csv_path is not None else None)
+            _vdb_back_off()
 
+    # Fallback to the CSV embedding matrix (or legacy spaCy)
     cleaned_incident = clean_text(incident_report)
-    cache_key = (cleaned_incident, float(similarity_threshold), float(mtime))
-    if cache_key in _query_result_cache:
-        return _query_result_cache[cache_key]
+    return _csv_fallback_causes([cleaned_incident], csv_path, similarity_threshold)[0]
 
-    best_match_cause: Optional[str] = None
-    best_score = -1.0
-    for r in rows:
-        score = calculate_phrase_similarity(cleaned_incident, r["_clean"])  # type: ignore[arg-type]
-        if score >= similarity_threshold and score > best_score:
-            best_score = score
-            best_match_cause = r["Root_Cause"]
 
-    _query_result_cache[cache_key] = best_match_cause
-    return best_match_cause
+def get_root_causes_for_incidents(
+    incident_reports: List[str],
+    csv_path: Optional[Path | str] = None,
+    similarity_threshold: float = 0.90,
+) -> List[Optional[str]]:
+    """Bulk form of get_root_cause_for_incident, aligned with the input list.
+
+    All reports are embedded in one call and searched in one Chroma query;
+    reports without a vector DB hit go through the CSV fallback together.
+    Empty reports map to None.
+    """
+    out: List[Optional[str]] = [None] * len(incident_reports)
+    pending = [
+        i
+        for i, r in enumerate(incident_reports)
+        if r is not None and str(r).strip() != ""
+    ]
+    if not pending:
+        return out
+
+    if _use_vdb():
+        try:
+            result = query_collection_many(
+                collection_name="incidents_cache",
+                query_texts=[str(incident_reports[i]) for i in pending],
+                k=5,
+                db_dir=DEFAULT_DB_DIR,
+            )
+            all_distances = result.get("distances") or [[] for _ in pending]
+            all_metas = result.get("metadatas") or [[] for _ in pending]
+            for i, distances, metas in zip(pending, all_distances, all_metas):
+                out[i] = _best_vdb_cause(distances, metas, similarity_threshold)
+            pending = [i for i in pending if out[i] is None]
+        except Exception:
+            # Fall through to CSV fallback
+            _vdb_back_off()
+
+    if pending:
+        cleaned = [clean_text(incident_reports[i]) for i in pending]
+        causes = _csv_fallback_causes(cleaned, csv_path, similarity_threshold)
+        for i, cause in zip(pending, causes):
+            out[i] = cause
+    return out
 
 
 def clear_caches() -> None:
-    """Clear all in-memory caches (docs, phrases, similarities, dataset, query)."""
-    _doc_cache.clear()
-    _phrase_cache.clear()
-    _sim_cache.clear()
-    _dataset_cache.update({"path": None, "mtime": None, "rows": None})
+    """Clear all in-memory caches (dataset, query, cleaned text)."""
+    _dataset_cache.update(
+        {
+            "path": None,
+            "mtime": None,
+            "report": None,
+            "cause": None,
+            "clean": None,
+            "emb": None,
+            "phrases": None,
+            "phrases_q": None,
+            "clusters": None,
+        }
+    )
     _query_result_cache.clear()
+    _clean_str.cache_clear()
 
 
 if __name__ == "__main__":  # Manual quick test (optional)
@@ -10,7 +10,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 
 try:
-    from .vector_db_utils import DEFAULT_DB_DIR, query_collection
+    from .vector_db_utils import DEFAULT_DB_DIR, best_match_index, query_collection
 except Exception as e:  # pragma: no cover
     raise RuntimeError("Chroma vector DB not available; build the DB first.") from e
 
@@ -32,13 +32,5 @@ def find_similar_problem(
     )
     distances = result.get("distances", [[]])[0] if result else []
     metas = result.get("metadatas", [[]])[0] if result else []
-    best = None
-    best_sim = -1.0
-    for dist, meta in zip(distances, metas):
-        if dist is None:
-            continue
-        sim = 1.0 - float(dist)
-        if sim >= similarity_threshold and sim > best_sim:
-            best_sim = sim
-            best = meta
-    return best
+    best = best_match_index(distances, similarity_threshold)
+    return metas[best] if best is not None else None
@@ -13,10 +13,14 @@ agents can reuse them without re-embedding.
 
 from __future__ import annotations
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
+from typing import Iterator, List, Optional, Tuple, Dict, Any
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -32,6 +36,16 @@ except Exception as e:  # pragma: no cover
         "Please install sentence-transformers to compute embeddings."
     ) from e
 
+import torch
+
+# Optional intra-op thread pinning for CPU inference, e.g. EMBEDDER_NUM_THREADS=8
+# or EMBEDDER_NUM_THREADS=auto (half the cores). Left to torch's default if unset.
+_NUM_THREADS = os.getenv("EMBEDDER_NUM_THREADS", "").strip().lower()
+if _NUM_THREADS == "auto":
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+elif _NUM_THREADS.isdigit() and int(_NUM_THREADS) > 0:
+    torch.set_num_threads(int(_NUM_THREADS))
+
 
 DEFAULT_DB_DIR = (
     Path(__file__).parent / "data" / "processed-data" / "vector-db"
@@ -44,68 +58,251 @@ def _ensure_db_dir(db_dir: Optional[Path] = None) -> Path:
     return d
 
 
-def get_client(db_dir: Optional[Path] = None) -> "chromadb.Client":
-    base = _ensure_db_dir(db_dir)
-    client = chromadb.Client(
+def _db_key(db_dir: Optional[Path] = None) -> str:
+    return str(Path(db_dir) if db_dir is not None else DEFAULT_DB_DIR)
+
+
+# Clients and models are loaded under a lock and checked again inside it:
+# lru_cache would let every thread that misses a cold cache build its own copy.
+_CLIENTS: Dict[str, "chromadb.Client"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _open_client(db_dir_str: str) -> "chromadb.Client":
+    base = _ensure_db_dir(Path(db_dir_str))
+    return chromadb.Client(
         Settings(
             is_persistent=True,
             persist_directory=str(base),
         )
     )
+
+
+def get_client(db_dir: Optional[Path] = None) -> "chromadb.Client":
+    """Return the process-wide Chroma client for `db_dir` (opened once)."""
+    key = _db_key(db_dir)
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = _CLIENTS[key] = _open_client(key)
     return client
 
 
+# Open collection handles keyed by (name, db_dir); cleared when a collection is
+# dropped here, and by query_embeddings when a query through a handle fails
+# (another process, e.g. build_vector_db, may have rebuilt the collection).
+_COLLECTIONS: Dict[Tuple[str, str], Any] = {}
+
+
 def get_or_create_collection(
     name: str,
     db_dir: Optional[Path] = None,
     metadata: Optional[Dict[str, Any]] = None,
 ):
+    key = (name, _db_key(db_dir))
+    collection = _COLLECTIONS.get(key)
+    if collection is None:
+        client = get_client(db_dir)
+        try:
+            collection = client.get_collection(name)
+        except Exception:
+            # Not built yet: the new empty collection is not cached, so the one
+            # an index build creates later is picked up on the next call
+            return client.create_collection(name=name, metadata=metadata or {})
+        _COLLECTIONS[key] = collection
+    return collection
+
+
+def recreate_collection(
+    name: str,
+    db_dir: Optional[Path] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+):
+    """Drop `name` if it exists and create it empty, invalidating cached handles."""
     client = get_client(db_dir)
+    # Drop if exists to avoid ID collisions when rows changed
     try:
-        return client.get_collection(name)
+        client.delete_collection(name)
     except Exception:
-        return client.create_collection(name=name, metadata=metadata or {})
+        pass
+    key = (name, _db_key(db_dir))
+    _COLLECTIONS.pop(key, None)
+    collection = client.create_collection(name=name, metadata=metadata or {})
+    _COLLECTIONS[key] = collection
+    return collection
+
+
+# EMBEDDER_BACKEND selects the inference runtime: torch (default) or onnx.
+_BACKEND = os.getenv("EMBEDDER_BACKEND", "torch").strip().lower()
+
+# EMBEDDER_PRECISION=auto (default) runs the transformer in bf16/fp16 on CUDA and
+# fp32 on CPU; fp32 disables reduced precision. EMBEDDER_QUANTIZE=int8 applies
+# dynamic int8 quantization to the Linear layers for CPU inference.
+_PRECISION = os.getenv("EMBEDDER_PRECISION", "auto").strip().lower()
+_QUANTIZE = os.getenv("EMBEDDER_QUANTIZE", "").strip().lower()
+
+
+def _upcast_token_embeddings(module, inputs, features):
+    # Keep mean pooling and L2 normalization in fp32 to avoid half-precision
+    # reduction error; only the transformer matmuls run in reduced precision.
+    features["token_embeddings"] = features["token_embeddings"].float()
+    return features
+
+
+class OnnxEmbedder:
+    """ONNX Runtime (CPU) encoder with mean pooling and L2 normalization.
+
+    Mirrors the subset of SentenceTransformer.encode used by Embedder so the two
+    backends are interchangeable. Requires `optimum[onnxruntime]`.
+    """
+
+    def __init__(self, model_name: str, max_length: int = 256) -> None:
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError(
+                "Please install optimum[onnxruntime] to use EMBEDDER_BACKEND=onnx."
+            ) from e
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_name, export=True, provider="CPUExecutionProvider"
+        )
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 64,
+        normalize_embeddings: bool = True,
+        convert_to_numpy: bool = True,
+    ) -> np.ndarray:
+        # Tokenize everything in one call, then pad per minibatch only
+        enc = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        out: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer.pad(
+                {k: v[start : start + batch_size] for k, v in enc.items()},
+                return_tensors="np",
+            )
+            tokens = np.asarray(self.model(**batch).last_hidden_state, np.float32)
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (tokens * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if normalize_embeddings:
+                norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+                pooled = pooled / np.maximum(norms, 1e-12)
+            out.append(pooled)
+        return np.concatenate(out, axis=0)
+
+
+_MODELS: Dict[Tuple[str, str], Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _get_model(name: str, precision: str = _PRECISION):
+    """Load the encoder for `name` once per process (SentenceTransformer or ONNX)."""
+    key = (name, precision)
+    model = _MODELS.get(key)
+    if model is None:
+        with _MODELS_LOCK:
+            model = _MODELS.get(key)
+            if model is None:
+                model = _MODELS[key] = _load_model(name, precision)
+    return model
+
+
+def _load_model(name: str, precision: str):
+    if _BACKEND == "onnx":
+        return OnnxEmbedder(name)
+    model = SentenceTransformer(name)
+    model.eval()
+    if precision != "fp32" and model.device.type == "cuda":
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        model[0].auto_model.to(dtype=dtype)
+        model[0].register_forward_hook(_upcast_token_embeddings)
+    elif model.device.type == "cpu" and _QUANTIZE == "int8":
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return model
 
 
 @dataclass
 class Embedder:
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
-    _model: Optional[SentenceTransformer] = None
+    # auto: half-precision transformer on CUDA; fp32: full precision everywhere.
+    # Defaults to EMBEDDER_PRECISION. Output rows are float32 either way.
+    precision: str = _PRECISION
 
-    def _load(self) -> SentenceTransformer:
-        if self._model is None:
-            self._model = SentenceTransformer(self.model_name)
-        return self._model
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Embed `texts` as an (N, dim) float32 array of L2-normalized rows.
 
-    def encode(self, texts: List[str]) -> List[List[float]]:
-        model = self._load()
-        # Use normalize_embeddings for better cosine search behavior
-        return model.encode(texts, normalize_embeddings=True).tolist()
+        The array goes to Chroma as is; converting to nested lists would only box
+        every value into a Python float for Chroma to unbox again.
+        """
+        model = _get_model(self.model_name, self.precision)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Encode in length-sorted order so each minibatch pads to similar lengths,
+        # then scatter the rows back into the caller's order
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        with torch.inference_mode():
+            sorted_emb = model.encode(
+                [texts[i] for i in order],
+                batch_size=batch_size,
+                # Use normalize_embeddings for better cosine search behavior
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+        out = np.empty(sorted_emb.shape, dtype=np.float32)
+        out[order] = sorted_emb
+        return out
 
 
-def _read_csv_column(
-    csv_path: Path, text_column: str, id_column: Optional[str] = None
+def _chunk_records(
+    df: pd.DataFrame, text_column: str, id_column: Optional[str] = None
 ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
-    df = pd.read_csv(csv_path)
-    if text_column not in df.columns:
+    """Turn one CSV chunk into (texts, ids, metadatas), skipping empty texts."""
+    df = df.dropna(subset=[text_column])
+    stripped = df[text_column].astype(str).str.strip()
+    keep = stripped != ""
+    df = df[keep]
+    texts: List[str] = stripped[keep].tolist()
+    if id_column and id_column in df.columns:
+        ids = df[id_column].astype(str).tolist()
+    else:
+        ids = [str(i) for i in df.index]
+    # NaN -> None so metadata values stay Chroma friendly
+    metadatas: List[Dict[str, Any]] = (
+        df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    )
+    return texts, ids, metadatas
+
+
+def _iter_csv_batches(
+    csv_path: Path,
+    text_column: str,
+    id_column: Optional[str] = None,
+    chunksize: int = 1024,
+) -> Iterator[Tuple[List[str], List[str], List[Dict[str, Any]]]]:
+    """Stream a CSV in row chunks so the whole file is never held in memory.
+
+    Row ids default to the running row index, which pandas keeps contiguous
+    across chunks.
+    """
+    columns = pd.read_csv(csv_path, nrows=0, encoding="utf-8").columns
+    if text_column not in columns:
         raise ValueError(
-            f"Column '{text_column}' not found in CSV. Available: {list(df.columns)}"
-        )
-    texts: List[str] = []
-    ids: List[str] = []
-    metadatas: List[Dict[str, Any]] = []
-    for idx, row in df.iterrows():
-        txt = str(row[text_column]).strip()
-        if not txt:
-            continue
-        doc_id = (
-            str(row[id_column]) if id_column and id_column in df.columns else str(idx)
+            f"Column '{text_column}' not found in CSV. Available: {list(columns)}"
         )
-        meta = {k: (None if pd.isna(v) else v) for k, v in row.to_dict().items()}
-        texts.append(txt)
-        ids.append(doc_id)
-        metadatas.append(meta)
-    return texts, ids, metadatas
+    for chunk in pd.read_csv(
+        csv_path, chunksize=chunksize, encoding="utf-8", dtype=str
+    ):
+        texts, ids, metadatas = _chunk_records(chunk, text_column, id_column)
+        if texts:
+            yield texts, ids, metadatas
 
 
 def build_chroma_collection_from_csv(
@@ -116,39 +313,63 @@ def build_chroma_collection_from_csv(
     id_column: Optional[str] = None,
     db_dir: Optional[Path] = None,
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    batch_size: int = 64,
+    chunksize: int = 1024,
+    hnsw_space: str = "cosine",
+    hnsw_construction_ef: int = 200,
+    hnsw_m: int = 32,
+    hnsw_search_ef: int = 64,
 ) -> None:
     """Create or refresh a Chroma collection from a CSV column.
 
     This overwrites existing docs in the collection by deleting and recreating it,
-    keeping the DB directory intact for other collections.
-    """
-    client = get_client(db_dir)
-    # Drop if exists to avoid ID collisions when rows changed
-    try:
-        client.delete_collection(collection_name)
-    except Exception:
-        pass
+    keeping the DB directory intact for other collections. The CSV is streamed in
+    `chunksize` rows and each chunk is embedded and inserted before the next one
+    is read; `batch_size` is the transformer minibatch size used by the embedder.
 
-    collection = client.create_collection(name=collection_name)
+    The hnsw_* arguments set the index parameters. With the cosine space Chroma
+    returns distance = 1 - cosine similarity, which is what callers threshold on;
+    the larger construction_ef/M/search_ef favour recall at small k over build time.
+    """
+    metadata = {
+        "hnsw:space": hnsw_space,
+        "hnsw:construction_ef": hnsw_construction_ef,
+        "hnsw:M": hnsw_m,
+        "hnsw:search_ef": hnsw_search_ef,
+    }
+    collection = recreate_collection(collection_name, db_dir=db_dir, metadata=metadata)
     embedder = Embedder(model_name)
-    texts, ids, metadatas = _read_csv_column(csv_path, text_column, id_column)
-
-    if not texts:
-        return
-
-    # Chunk inserts to avoid large payloads
-    CHUNK = 512
-    for start in range(0, len(texts), CHUNK):
-        batch_texts = texts[start : start + CHUNK]
-        batch_ids = ids[start : start + CHUNK]
-        batch_metas = metadatas[start : start + CHUNK]
-        embeddings = embedder.encode(batch_texts)
+    probe: List[Any] = []
+
+    def _add(pending) -> None:
+        fut, batch_texts, batch_ids, batch_metas = pending
+        embeddings = fut.result()
         collection.add(
             ids=batch_ids,
             embeddings=embeddings,
             documents=batch_texts,
             metadatas=batch_metas,
         )
+        if not probe:
+            probe.append(embeddings[0])
+
+    # Pipeline: embed chunk N+1 on a worker thread while chunk N is inserted on
+    # this one. Both torch/ONNX inference and Chroma's native insert release the GIL.
+    pending = None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for batch_texts, batch_ids, batch_metas in _iter_csv_batches(
+            csv_path, text_column, id_column, chunksize
+        ):
+            fut = pool.submit(embedder.encode, batch_texts, batch_size)
+            if pending is not None:
+                _add(pending)
+            pending = (fut, batch_texts, batch_ids, batch_metas)
+        if pending is not None:
+            _add(pending)
+
+    # Page the freshly built index in before the first real query
+    if probe:
+        collection.query(query_embeddings=probe, n_results=1, include=["distances"])
 
 
 def query_collection(
@@ -163,12 +384,81 @@ def query_collection(
 
     Returns a dict containing distances, ids, documents, and metadatas.
     """
+    q_emb = Embedder(model_name).encode([query_text])
+    return query_embeddings(collection_name, q_emb, k=k, db_dir=db_dir)
+
+
+def query_collection_many(
+    *,
+    collection_name: str,
+    query_texts: List[str],
+    k: int = 5,
+    db_dir: Optional[Path] = None,
+    model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+) -> Dict[str, Any]:
+    """Query a collection with several texts in one embed call and one search.
+
+    Returns the Chroma result dict; each field holds one list per query text.
+    """
+    q_embs = Embedder(model_name).encode(query_texts)
+    return query_embeddings(collection_name, q_embs, k=k, db_dir=db_dir)
+
+
+def query_embeddings(
+    collection_name: str,
+    embeddings: np.ndarray,
+    *,
+    k: int = 5,
+    db_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Search a collection with precomputed query embeddings.
+
+    A failed query drops the cached handle and is retried once on a fresh one,
+    so a collection rebuilt by another process is found again.
+    """
+    key = (collection_name, _db_key(db_dir))
+    # ids are always returned; Chroma rejects "ids" as an include field
+    include = ["distances", "metadatas", "documents"]
     collection = get_or_create_collection(collection_name, db_dir=db_dir)
-    embedder = Embedder(model_name)
-    q_emb = embedder.encode([query_text])[0]
-    result = collection.query(
-        query_embeddings=[q_emb],
-        n_results=k,
-        include=["distances", "metadatas", "documents", "ids"],
-    )
-    return result
+    try:
+        return collection.query(
+            query_embeddings=embeddings, n_results=k, include=include
+        )
+    except Exception:
+        if _COLLECTIONS.get(key) is not collection:
+            raise
+        _COLLECTIONS.pop(key, None)
+    collection = get_or_create_collection(collection_name, db_dir=db_dir)
+    return collection.query(query_embeddings=embeddings, n_results=k, include=include)
+
+
+def best_match_index(
+    distances: List[Optional[float]], similarity_threshold: float
+) -> Optional[int]:
+    """Index of the closest hit with cosine similarity >= threshold, else None.
+
+    Embeddings are normalized, so cosine distance = 1 - cosine similarity.
+    Missing distances never match.
+    """
+    if not distances:
+        return None
+    d = np.array([np.inf if x is None else x for x in distances], dtype=np.float32)
+    sims = 1.0 - d
+    best = int(sims.argmax())
+    return best if sims[best] >= similarity_threshold else None
+
+
+def warmup(
+    collection_names: Tuple[str, ...] = (
+        "incidents_cache",
+        "problems_cache",
+        "kb_docs",
+    ),
+    db_dir: Optional[Path] = None,
+    model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+) -> None:
+    """Open the default collections and load the embedding model ahead of the
+    first query, e.g. at process start."""
+    for name in collection_names:
+        get_or_create_collection(name, db_dir=db_dir)
+    _get_model(model_name)
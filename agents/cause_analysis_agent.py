@@ -2,6 +2,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
+
+import numpy as np
+
 from .knowledge_base_ingest import query_kb
 from .utils.bootstrap import bootstrap_analyzer_helpers
 
@@ -43,6 +46,17 @@ class CauseAnalysisAgent:
             incident_report, similarity_threshold=threshold
         )
 
+    def cache_lookup_many(
+        self, incident_reports: List[str], threshold: float = 0.90
+    ) -> List[Optional[str]]:
+        # Bulk form: one embed call and one vector DB query for all reports
+        bootstrap_analyzer_helpers(Path(__file__).parent)
+        from analyzer_helpers.cache_requests import get_root_causes_for_incidents  # type: ignore
+
+        return get_root_causes_for_incidents(
+            incident_reports, similarity_threshold=threshold
+        )
+
     # 2) Knowledge base search: stub that returns empty
     def kb_search(self, incident_report: str, k: int = 5) -> List[CauseCandidate]:
         try:
@@ -72,6 +86,7 @@ class CauseAnalysisAgent:
         cache_cause: Optional[str],
         kb: List[CauseCandidate],
         gcrnn: List[CauseCandidate],
+        top_k: Optional[int] = None,
     ) -> List[CauseCandidate]:
         out: Dict[str, float] = {}
         if cache_cause:
@@ -80,14 +95,21 @@ class CauseAnalysisAgent:
             out[c.label] = max(out.get(c.label, 0.0), c.score)
         for c in gcrnn:
             out[c.label] = max(out.get(c.label, 0.0), c.score)
-        ranked = [
-            CauseCandidate(label=k, score=v)
-            for k, v in sorted(out.items(), key=lambda kv: kv[1], reverse=True)
-        ]
-        return ranked
+        if top_k is None or top_k >= len(out):
+            ranked = sorted(out.items(), key=lambda kv: kv[1], reverse=True)
+            return [CauseCandidate(label=k, score=v) for k, v in ranked[:top_k]]
+        if top_k <= 0:
+            return []
+        # Partial sort: only the top_k candidates get ordered
+        labels = list(out.keys())
+        scores = np.fromiter(out.values(), dtype=np.float64, count=len(out))
+        idx = np.argpartition(-scores, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return [CauseCandidate(label=labels[i], score=float(scores[i])) for i in idx]
 
-    def analyze(self, incident_report: str) -> Dict[str, Any]:
-        cache_cause = self.cache_lookup(incident_report)
+    def _analyze_with_cache(
+        self, incident_report: str, cache_cause: Optional[str]
+    ) -> Dict[str, Any]:
         kb = self.kb_search(incident_report)
         gcrnn = self.gcrnn_infer(incident_report)
         ranked = self.rank_causes(cache_cause, kb, gcrnn)
@@ -96,3 +118,16 @@ class CauseAnalysisAgent:
             "cache_cause": cache_cause,
             "ranked_causes": [c.__dict__ for c in ranked],
         }
+
+    def analyze(self, incident_report: str) -> Dict[str, Any]:
+        return self._analyze_with_cache(
+            incident_report, self.cache_lookup(incident_report)
+        )
+
+    def analyze_many(self, incident_reports: List[str]) -> List[Dict[str, Any]]:
+        # Resolve cache hits for the whole batch in one bulk lookup
+        cache_causes = self.cache_lookup_many(incident_reports)
+        return [
+            self._analyze_with_cache(report, cause)
+            for report, cause in zip(incident_reports, cache_causes)
+        ]
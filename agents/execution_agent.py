@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 import os
 import smtplib
+import threading
 from email.mime.text import MIMEText
 
 import pandas as pd
 from jinja2 import Environment, BaseLoader
 
+# Templates are parsed and compiled once at import; compiled Jinja templates are
+# safe to render concurrently.
+_JINJA_ENV = Environment(loader=BaseLoader(), autoescape=False, cache_size=64)
 
 CONTACTS_CSV = (
     Path(__file__).parent
@@ -19,27 +24,43 @@ CONTACTS_CSV = (
 )
 
 
-def _load_contacts(path: Path = CONTACTS_CSV) -> pd.DataFrame:
-    if not path.exists():
-        return pd.DataFrame(columns=["team", "role", "email", "component_keywords"])
-    return pd.read_csv(path)
+@lru_cache(maxsize=4)
+def _read_contacts(path_str: str, mtime: float) -> pd.DataFrame:
+    # mtime is part of the key so an edited contacts file is picked up.
+    return pd.read_csv(path_str)
 
 
-def select_contact(component_hint: str) -> Optional[Dict[str, Any]]:
-    df = _load_contacts()
+@lru_cache(maxsize=1024)
+def _match_contact(hint: str, path_str: str, mtime: float) -> Optional[Dict[str, Any]]:
+    df = _read_contacts(path_str, mtime)
     if df.empty:
         return None
-    if not component_hint:
+    if not hint or "component_keywords" not in df.columns:
         return df.iloc[0].to_dict()
-    scores = []
-    for _, row in df.iterrows():
-        kw = str(row.get("component_keywords", "")).lower()
-        score = 1 if component_hint.lower() in kw else 0
-        scores.append(score)
-    idx = int(max(range(len(scores)), key=lambda i: scores[i]))
+    mask = (
+        df["component_keywords"]
+        .astype(str)
+        .str.lower()
+        .str.contains(hint, regex=False, na=False)
+        .to_numpy()
+    )
+    # First matching contact, else the first row (same as the old max-score scan)
+    idx = int(mask.argmax()) if mask.any() else 0
     return df.iloc[idx].to_dict()
 
 
+def select_contact(component_hint: str) -> Optional[Dict[str, Any]]:
+    # Incidents in a burst usually share a component, so matches are memoized
+    # per (hint, contacts file version); callers get their own copy.
+    path = CONTACTS_CSV
+    if not path.exists():
+        return None
+    contact = _match_contact(
+        (component_hint or "").lower(), str(path), path.stat().st_mtime
+    )
+    return dict(contact) if contact is not None else None
+
+
 EMAIL_TEMPLATE = """
 Subject: {{ subject }}
 
@@ -59,14 +80,13 @@ Recommended steps:
 Thanks,
 Duty Officer Bot
 """
+_EMAIL_TMPL = _JINJA_ENV.from_string(EMAIL_TEMPLATE)
 
 
 def draft_email(
     contact: Dict[str, Any], incident: Dict[str, Any], cause: str, steps: List[str]
 ) -> str:
-    env = Environment(loader=BaseLoader())
-    t = env.from_string(EMAIL_TEMPLATE)
-    return t.render(
+    return _EMAIL_TMPL.render(
         contact=contact,
         incident=incident,
         cause=cause,
@@ -75,6 +95,56 @@ def draft_email(
     )
 
 
+# One authenticated SMTP session shared by all senders; the lock serializes use
+# of the connection so concurrent escalations reuse a single TLS handshake/login.
+_SMTP_LOCK = threading.Lock()
+_smtp_session: Optional[smtplib.SMTP] = None
+_smtp_key: Optional[tuple] = None
+
+
+def _connect_smtp(host: str, port: int, user: str, password: str) -> smtplib.SMTP:
+    server = smtplib.SMTP(host, port)
+    server.starttls()
+    server.login(user, password)
+    return server
+
+
+def _get_smtp(host: str, port: int, user: str, password: str) -> smtplib.SMTP:
+    """Return the cached session, reconnecting if it dropped or settings changed.
+
+    Must be called with _SMTP_LOCK held.
+    """
+    global _smtp_session, _smtp_key
+    key = (host, port, user)
+    if _smtp_session is not None and _smtp_key == key:
+        try:
+            if _smtp_session.noop()[0] == 250:
+                return _smtp_session
+        except (smtplib.SMTPException, OSError):
+            pass
+    _close_smtp_unlocked()
+    _smtp_session = _connect_smtp(host, port, user, password)
+    _smtp_key = key
+    return _smtp_session
+
+
+def _close_smtp_unlocked() -> None:
+    global _smtp_session, _smtp_key
+    if _smtp_session is not None:
+        try:
+            _smtp_session.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    _smtp_session = None
+    _smtp_key = None
+
+
+def close_smtp() -> None:
+    """Close the shared SMTP session (e.g. at shutdown)."""
+    with _SMTP_LOCK:
+        _close_smtp_unlocked()
+
+
 def send_email(
     message_text: str, to_addr: str, dry_run_default: bool = True
 ) -> Dict[str, Any]:
@@ -93,10 +163,16 @@ def send_email(
     if dry:
         return {"status": "dry-run", "to": to_addr, "message": message_text[:5000]}
 
-    with smtplib.SMTP(smtp_host, smtp_port) as server:
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.sendmail(msg["From"], [to_addr], msg.as_string())
+    payload = msg.as_string()
+    with _SMTP_LOCK:
+        server = _get_smtp(smtp_host, smtp_port, smtp_user, smtp_pass)
+        try:
+            server.sendmail(msg["From"], [to_addr], payload)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped us between NOOP and send; retry once on a new session
+            _close_smtp_unlocked()
+            server = _get_smtp(smtp_host, smtp_port, smtp_user, smtp_pass)
+            server.sendmail(msg["From"], [to_addr], payload)
     return {"status": "sent", "to": to_addr}
 
 
@@ -119,13 +195,12 @@ SUMMARY_TEMPLATE_MD = """
 {% for s in pending %}- {{ s }}
 {% endfor %}
 """
+_SUMMARY_TMPL = _JINJA_ENV.from_string(SUMMARY_TEMPLATE_MD)
 
 
 def render_summary_md(
     incident: Dict[str, Any], cause: str, steps_taken: List[str], pending: List[str]
 ) -> str:
-    env = Environment(loader=BaseLoader())
-    t = env.from_string(SUMMARY_TEMPLATE_MD)
-    return t.render(
+    return _SUMMARY_TMPL.render(
         incident=incident, cause=cause, steps_taken=steps_taken, pending=pending
     )
@@ -4,49 +4,94 @@ from pathlib import Path
 from typing import Dict, Any
 import json
 
+import numpy as np
 import pandas as pd
-import networkx as nx
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+# Accepted column names, in order of preference
+_COMPONENT_COLUMNS = ("Component", "component", "Service", "service")
+_CAUSE_COLUMNS = ("Root_Cause", "Cause", "root_cause")
+
+
+def _clean_column(df: pd.DataFrame, col: str | None) -> np.ndarray:
+    if col is None:
+        return np.full(len(df), "", dtype=object)
+    # Strip each distinct category once, then expand through the codes;
+    # code -1 (missing) maps onto the trailing "".
+    series = df[col]
+    cats = series.cat.categories.astype(str).str.strip().to_numpy(dtype=object)
+    return np.append(cats, "")[series.cat.codes.to_numpy()]
+
+
+def _write_json(out_path: Path, data: Dict[str, Any]) -> None:
+    # orjson encodes straight to UTF-8 bytes; stdlib json is the fallback
+    if orjson is not None:
+        Path(out_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    Path(out_path).write_text(json.dumps(data, indent=2), encoding="utf-8")
 
 
 def build_graph_from_incidents(
     csv_path: Path, out_path: Path | None = None
 ) -> Dict[str, Any]:
-    df = pd.read_csv(csv_path)
-    g = nx.DiGraph()
-
-    comp_col = None
-    for c in ["Component", "component", "Service", "service"]:
-        if c in df.columns:
-            comp_col = c
-            break
-
-    cause_col = None
-    for c in ["Root_Cause", "Cause", "root_cause"]:
-        if c in df.columns:
-            cause_col = c
-            break
+    # Probe the header, then parse only the two columns used, as categoricals
+    cols = set(pd.read_csv(csv_path, nrows=0).columns)
+    comp_col = next((c for c in _COMPONENT_COLUMNS if c in cols), None)
+    cause_col = next((c for c in _CAUSE_COLUMNS if c in cols), None)
 
     if comp_col is None and cause_col is None:
         # Nothing to extract
         data = {"nodes": [], "edges": []}
         if out_path:
-            Path(out_path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+            _write_json(out_path, data)
         return data
 
-    for _, row in df.iterrows():
-        comp = str(row.get(comp_col, "")).strip() if comp_col else ""
-        cause = str(row.get(cause_col, "")).strip() if cause_col else ""
-        if comp:
-            g.add_node(comp, type="component", label=comp)
-        if cause:
-            g.add_node(cause, type="cause", label=cause)
-        if comp and cause:
-            g.add_edge(cause, comp, relation="affects")
+    df = pd.read_csv(
+        csv_path,
+        usecols=[c for c in (comp_col, cause_col) if c],
+        dtype="category",
+        engine="c",
+    )
+
+    # Normalize both columns at once; a missing column behaves as all-empty
+    comps = _clean_column(df, comp_col)
+    causes = _clean_column(df, cause_col)
+
+    # Nodes in first-seen order, visiting each row's component before its cause.
+    # A label used as both keeps the type of its last occurrence, as before.
+    n = len(df)
+    labels = np.empty(2 * n, dtype=object)
+    labels[0::2] = comps
+    labels[1::2] = causes
+    types = np.empty(2 * n, dtype=object)
+    types[0::2] = "component"
+    types[1::2] = "cause"
+    keep = labels != ""
+    stacked = pd.DataFrame({"id": labels[keep], "type": types[keep]})
+    last_type = stacked.drop_duplicates("id", keep="last").set_index("id")["type"]
+    node_ids = stacked["id"].drop_duplicates().tolist()
+
+    pairs = pd.DataFrame({"src": causes, "dst": comps})
+    pairs = pairs[(pairs["src"] != "") & (pairs["dst"] != "")].drop_duplicates()
+    # Group edges by source in node order, as DiGraph adjacency iteration did
+    node_pos = pd.Series(np.arange(len(node_ids)), index=node_ids)
+    pairs = pairs.iloc[np.argsort(node_pos.loc[pairs["src"]].to_numpy(), kind="stable")]
 
     data = {
-        "nodes": [{"id": n, **g.nodes[n]} for n in g.nodes],
-        "edges": [{"src": u, "dst": v, **g.edges[u, v]} for u, v in g.edges],
+        "nodes": [
+            {"id": i, "type": t, "label": i}
+            for i, t in zip(node_ids, last_type.loc[node_ids].tolist())
+        ],
+        "edges": [
+            {"src": u, "dst": v, "relation": "affects"}
+            for u, v in zip(pairs["src"].tolist(), pairs["dst"].tolist())
+        ],
     }
     if out_path:
-        Path(out_path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+        _write_json(out_path, data)
     return data
@@ -1,6 +1,15 @@
 from __future__ import annotations
+import functools
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
+
+import numpy as np
+
 from .utils.bootstrap import bootstrap_analyzer_helpers
 
 """
@@ -8,65 +17,177 @@ Knowledge base ingestion: load PDFs from knowledge_base/ into Chroma collection
 `kb_docs` and provide a simple query interface.
 """
 
+# pymupdf is preferred when installed; pypdf is the fallback
+_HAS_PYMUPDF = importlib.util.find_spec("pymupdf") is not None
 
-def iter_pdf_texts(kb_dir: Path) -> List[Dict[str, Any]]:
-    try:
-        from pypdf import PdfReader  # type: ignore
-    except Exception as e:  # pragma: no cover
-        raise RuntimeError("Please install pypdf for PDF loading.") from e
-    items: List[Dict[str, Any]] = []
-    for pdf in kb_dir.glob("*.pdf"):
-        reader = PdfReader(str(pdf))
-        for i, page in enumerate(reader.pages):
+
+def _page_texts_pymupdf(pdf_path: str) -> Iterator[str]:
+    import pymupdf  # type: ignore
+
+    pymupdf.TOOLS.mupdf_display_errors(False)
+    with pymupdf.open(pdf_path) as doc:
+        for page in doc:
             try:
-                text = page.extract_text() or ""
+                yield page.get_text("text") or ""
             except Exception:
-                text = ""
-            text = text.strip()
-            if not text:
-                continue
-            items.append(
-                {
-                    "id": f"{pdf.name}::p{i}",
-                    "document": text,
-                    "metadata": {"file": pdf.name, "page": i},
-                }
-            )
+                yield ""
+
+
+def _page_texts_pypdf(pdf_path: str) -> Iterator[str]:
+    from pypdf import PdfReader  # type: ignore
+
+    for page in PdfReader(pdf_path).pages:
+        try:
+            yield page.extract_text() or ""
+        except Exception:
+            yield ""
+
+
+def _extract_one_pdf(pdf_path: str) -> List[Dict[str, Any]]:
+    """Per-page items for one PDF. Top-level so process pools can pickle it.
+
+    Uses pymupdf (MuPDF, C) when installed and pypdf otherwise.
+    """
+    pages = _page_texts_pymupdf if _HAS_PYMUPDF else _page_texts_pypdf
+    name = Path(pdf_path).name
+    items: List[Dict[str, Any]] = []
+    for i, text in enumerate(pages(pdf_path)):
+        text = text.strip()
+        if not text:
+            continue
+        items.append(
+            {
+                "id": f"{name}::p{i}",
+                "document": text,
+                "metadata": {"file": name, "page": i},
+            }
+        )
+    return items
+
+
+def iter_pdf_texts(
+    kb_dir: Path, max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Extract page texts from every PDF in kb_dir, one worker process per file.
+
+    Extraction is CPU-bound pure Python, so files are spread over processes;
+    results keep the directory listing order. Workers are spawned, not forked:
+    callers may have other threads inside torch or Chroma, and forking a process
+    mid-call in those can deadlock the child.
+    """
+    if not _HAS_PYMUPDF:
+        try:
+            import pypdf  # type: ignore  # noqa: F401
+        except Exception as e:  # pragma: no cover
+            raise RuntimeError(
+                "Please install pymupdf or pypdf for PDF loading."
+            ) from e
+    pdfs = [str(p) for p in kb_dir.glob("*.pdf")]
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) - 1)
+    max_workers = min(max_workers, len(pdfs))
+    items: List[Dict[str, Any]] = []
+    if max_workers <= 1:
+        for pdf in pdfs:
+            items.extend(_extract_one_pdf(pdf))
+        return items
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as ex:
+        for pdf_items in ex.map(_extract_one_pdf, pdfs):
+            items.extend(pdf_items)
     return items
 
 
+# Process-local Embedder per model for query_kb; never shipped to worker processes
+_EMBEDDERS: Dict[str, Any] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def _vdb():
+    """analyzer_helpers.vector_db_utils (torch, chromadb), imported on first use.
+
+    Bootstrapping here lets the module resolve helpers in any environment.
+    """
+    bootstrap_analyzer_helpers(Path(__file__).parent)
+    from analyzer_helpers import vector_db_utils  # type: ignore
+
+    return vector_db_utils
+
+
+def _max_add_batch(client, default: int = 4096) -> int:
+    """Largest batch the Chroma client accepts in one add (older clients: default)."""
+    try:
+        return int(client.get_max_batch_size())
+    except Exception:
+        return default
+
+
 def index_kb_pdfs(
     kb_dir: Path,
     *,
     collection_name: str = "kb_docs",
     db_dir: Optional[Path] = None,
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    precision: Optional[str] = None,
 ) -> None:
-    # Lazy import to ensure bootstrap works across environments
-    bootstrap_analyzer_helpers(Path(__file__).parent)
-    from analyzer_helpers.vector_db_utils import get_client, Embedder  # type: ignore
+    """Rebuild `collection_name` from the PDFs in kb_dir.
 
-    client = get_client(db_dir)
-    try:
-        client.delete_collection(collection_name)
-    except Exception:
-        pass
-    col = client.create_collection(collection_name)
-    embedder = Embedder(model_name)
+    precision ("auto"/"fp32") overrides EMBEDDER_PRECISION for this build; with
+    "auto" the transformer runs in half precision on CUDA. Chroma stores float32.
+    """
+    vdb = _vdb()
+    client = vdb.get_client(db_dir)
+    # Drop and recreate through the shared helper so cached handles stay valid;
+    # cosine space makes 1 - distance the similarity kb_search expects.
+    col = vdb.recreate_collection(
+        collection_name, db_dir=db_dir, metadata={"hnsw:space": "cosine"}
+    )
+    Embedder = vdb.Embedder
+    embedder = Embedder(model_name, precision) if precision else Embedder(model_name)
     items = iter_pdf_texts(kb_dir)
     if not items:
         return
-    CHUNK = 256
-    for s in range(0, len(items), CHUNK):
-        batch = items[s : s + CHUNK]
-        texts = [b["document"] for b in batch]
-        embeddings = embedder.encode(texts)
-        col.add(
-            ids=[b["id"] for b in batch],
-            documents=texts,
-            embeddings=embeddings,
-            metadatas=[b["metadata"] for b in batch],
-        )
+    # Pages with identical text (cover pages, boilerplate) are embedded once;
+    # groups hold the indices of every page sharing a text.
+    by_hash: Dict[bytes, List[int]] = {}
+    for i, it in enumerate(items):
+        h = hashlib.blake2b(it["document"].encode("utf-8"), digest_size=16).digest()
+        by_hash.setdefault(h, []).append(i)
+    # Batch texts of similar length together: Embedder.encode only length-sorts
+    # within one call, so a global sort keeps padding low in every chunk too.
+    # Each add carries its own ids, so the original order need not be restored.
+    groups = sorted(by_hash.values(), key=lambda g: len(items[g[0]]["document"]))
+    # Few large adds amortize Chroma's per-call transaction and index update
+    max_add = _max_add_batch(client)
+    CHUNK = min(4096, max_add)
+
+    def _add(chunk: List[List[int]], unique_emb: np.ndarray) -> None:
+        # Broadcast each unique embedding to all pages in its group
+        rows = np.repeat(np.arange(len(chunk)), [len(g) for g in chunk])
+        batch = [items[i] for g in chunk for i in g]
+        embeddings = unique_emb[rows]
+        # Duplicates can push a chunk past the client's batch limit
+        for a in range(0, len(batch), max_add):
+            part = batch[a : a + max_add]
+            col.add(
+                ids=[b["id"] for b in part],
+                documents=[b["document"] for b in part],
+                embeddings=embeddings[a : a + max_add],
+                metadatas=[b["metadata"] for b in part],
+            )
+
+    # Pipeline: embed chunk N+1 on a worker thread while chunk N is inserted on
+    # this one, as build_chroma_collection_from_csv does.
+    pending = None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for s in range(0, len(groups), CHUNK):
+            chunk = groups[s : s + CHUNK]
+            fut = pool.submit(embedder.encode, [items[g[0]]["document"] for g in chunk])
+            if pending is not None:
+                _add(pending[0], pending[1].result())
+            pending = (chunk, fut)
+        if pending is not None:
+            _add(pending[0], pending[1].result())
 
 
 def query_kb(
@@ -77,13 +198,10 @@ def query_kb(
     db_dir: Optional[Path] = None,
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
 ) -> Dict[str, Any]:
-    bootstrap_analyzer_helpers(Path(__file__).parent)
-    from analyzer_helpers.vector_db_utils import get_or_create_collection, Embedder  # type: ignore
-
-    col = get_or_create_collection(collection_name, db_dir)
-    emb = Embedder(model_name).encode([query])[0]
-    return col.query(
-        query_embeddings=[emb],
-        n_results=k,
-        include=["documents", "metadatas", "distances", "ids"],
+    vdb = _vdb()
+    embedder = _EMBEDDERS.get(model_name)
+    if embedder is None:
+        embedder = _EMBEDDERS.setdefault(model_name, vdb.Embedder(model_name))
+    return vdb.query_embeddings(
+        collection_name, embedder.encode([query]), k=k, db_dir=db_dir
     )
@@ -1,67 +1,21 @@
 import asyncio
 from pathlib import Path
 from typing import Any, Dict
-import sys
-import re
-import types
-import importlib.util
 from fastmcp import FastMCP
 
+try:
+    from .utils.bootstrap import bootstrap_analyzer_helpers
+except ImportError:  # run as a script from agents/
+    from utils.bootstrap import bootstrap_analyzer_helpers
+
 
 """This was our intiial testing of an MCP orchestration agent for incident resolution.
 It defines placeholder tools, resources, and prompts that were expanded upon"""
 
 
-# Dynamically expose analyzer-helpers as a pseudo-package: analyzer_helpers
-def _bootstrap_analyzer_helpers() -> None:
-    # Prefer local helpers first; fall back to hackathon path if present
-    candidates = [
-        Path(__file__).parent / "analyzer-helpers",
-        Path(__file__).parent.parent
-        / "incident-analyzer-hackathon"
-        / "incident-analyzer"
-        / "analyzer-helpers",
-    ]
-    base = None
-    for c in candidates:
-        if c.exists():
-            base = c
-            break
-    if base is None:
-        return
-
-    pkg_name = "analyzer_helpers"
-    # Create a package shell
-    if pkg_name not in sys.modules:
-        pkg = types.ModuleType(pkg_name)
-        pkg.__path__ = [str(base)]  # mark as package-like
-        pkg.__package__ = pkg_name
-        sys.modules[pkg_name] = pkg
-    else:
-        pkg = sys.modules[pkg_name]
-
-    # Load all .py files as analyzer_helpers.<normalized_module_name>
-    for py in base.glob("*.py"):
-        if not py.is_file():
-            continue
-        stem = py.stem
-        # Normalize filenames like cache-requests.py -> cache_requests
-        mod_name = re.sub(r"[^0-9a-zA-Z_]", "_", stem)
-        fqmn = f"{pkg_name}.{mod_name}"
-
-        # Skip if already loaded
-        if fqmn in sys.modules:
-            continue
-
-        spec = importlib.util.spec_from_file_location(fqmn, py)
-        if spec and spec.loader:
-            mod = importlib.util.module_from_spec(spec)
-            sys.modules[fqmn] = mod
-            spec.loader.exec_module(mod)
-            setattr(pkg, mod_name, mod)
-
-
-_bootstrap_analyzer_helpers()
+# Expose analyzer-helpers as the pseudo-package analyzer_helpers; helper modules
+# are only loaded when first imported.
+bootstrap_analyzer_helpers(Path(__file__).parent)
 
 # Note: tools are exposed via MCP but the main orchestrator is separate
 
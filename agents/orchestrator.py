@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import html
 import json
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
@@ -21,26 +23,42 @@ class IncidentOrchestrator:
         self.rem_agent = RemediationAgent()
 
     def run(self, incident: Dict[str, Any]) -> Dict[str, Any]:
-        # 1) Cause analysis
-        analysis = self.cause_agent.analyze(
-            incident["summary"]
-        )  # using 'summary' as incident report text
+        return asyncio.run(self.run_async(incident))
+
+    async def run_async(self, incident: Dict[str, Any]) -> Dict[str, Any]:
+        # Cause analysis, remediation planning and contact lookup only read the
+        # incident, so they run concurrently on worker threads. On a cold process
+        # the first two both need the embedding model and Chroma client; the
+        # vector_db_utils loaders are locked, so one thread loads them and the
+        # other waits for that copy instead of loading its own.
+        analysis, remedy, contact = await asyncio.gather(
+            # 1) Cause analysis, using 'summary' as incident report text
+            asyncio.to_thread(self.cause_agent.analyze, incident["summary"]),
+            # 2) Remediation planning
+            asyncio.to_thread(
+                self.rem_agent.generate_solution,
+                incident.get("problem", incident["summary"]),
+            ),
+            # 3) Contact selection
+            asyncio.to_thread(select_contact, incident.get("component", "")),
+        )
+        return self._finish(incident, analysis, remedy, contact)
+
+    def _finish(
+        self,
+        incident: Dict[str, Any],
+        analysis: Dict[str, Any],
+        remedy: Dict[str, Any],
+        contact: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         best_cause = analysis.get("cache_cause") or (
             analysis.get("ranked_causes") and analysis["ranked_causes"][0].get("label")
         )
         cause_text = best_cause or "Cause under investigation"
-
-        # 2) Remediation planning
-        remedy = self.rem_agent.generate_solution(
-            incident.get("problem", incident["summary"])
-        )
         steps = remedy.get("proposed_steps", [])
 
-        # 3) Execution prep (contact + email draft)
-        contact = select_contact(incident.get("component", "")) or {
-            "team": "Unknown",
-            "email": "",
-        }
+        # 3) Execution prep (email draft)
+        contact = contact or {"team": "Unknown", "email": ""}
         email_text = draft_email(contact, incident, cause_text, steps)
 
         # Consent gate (do not actually send unless consent satisfied)
@@ -56,6 +74,8 @@ class IncidentOrchestrator:
             [] if email_result.get("status") == "sent" else ["Send escalation email"]
         )
         md = render_summary_md(incident, cause_text, steps_taken, pending)
+        # Escape each line so incident text containing "<" cannot inject markup
+        body = "<br/>".join(html.escape(line) for line in md.split("\n"))
 
         return {
             "incident": incident,
@@ -71,7 +91,7 @@ class IncidentOrchestrator:
                     "pending_actions": pending,
                 },
                 "markdown": md,
-                "html": f"<html><body>{md.replace('\n', '<br/>')}</body></html>",
+                "html": f"<html><body>{body}</body></html>",
             },
         }
 
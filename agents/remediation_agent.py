@@ -2,7 +2,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
+import functools
+import hashlib
 import json
+
+import numpy as np
+
 from .utils.bootstrap import bootstrap_analyzer_helpers
 from pathlib import Path as _P
 
@@ -20,6 +25,63 @@ This module implements:
 """
 
 
+# Heavy optional imports are deferred to first use so importing the agent (and
+# the orchestrator CLI) stays cheap.
+@functools.lru_cache(maxsize=1)
+def _sklearn():
+    import sklearn
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    return sklearn.__version__, HashingVectorizer, LogisticRegression
+
+
+@functools.lru_cache(maxsize=1)
+def _joblib():
+    try:
+        import joblib
+    except Exception:  # pragma: no cover
+        return None
+    return joblib
+
+
+def _argtopk_loop(scores, k):
+    # Insertion into a k-slot buffer kept in descending order; compiled by numba
+    best = np.empty(k, dtype=np.int64)
+    n_best = 0
+    for i in range(scores.shape[0]):
+        s = scores[i]
+        if n_best < k:
+            j = n_best
+            n_best += 1
+        elif s > scores[best[k - 1]]:
+            j = k - 1
+        else:
+            continue
+        while j > 0 and scores[best[j - 1]] < s:
+            best[j] = best[j - 1]
+            j -= 1
+        best[j] = i
+    return best
+
+
+def _argtopk_numpy(scores: np.ndarray, k: int) -> np.ndarray:
+    # Partial sort, then order only the k winners
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+@functools.lru_cache(maxsize=1)
+def _argtopk():
+    """Indices of the k largest scores, best first: numba kernel when numba is
+    installed, NumPy partial sort otherwise."""
+    try:
+        from numba import njit
+    except Exception:
+        return _argtopk_numpy
+    return njit(cache=True)(_argtopk_loop)
+
+
 @dataclass
 class Action:
     id: str
@@ -36,7 +98,13 @@ class RemediationAgent:
         self.catalog_path = self.data_dir / "processed-data" / "action_catalog.json"
         self.model_path = self.data_dir / "processed-data" / "remediation_baseline.json"
         self._catalog: List[Action] = []
+        self._id_to_action: Dict[str, Action] = {}
+        self._classes: List[str] = []
+        # Linear scores (C, n_features) / (C,) ordered like predict_proba
+        self._coef: Optional[np.ndarray] = None
+        self._intercept: Optional[np.ndarray] = None
         self._clf = None  # lazy
+        self._hv = None  # stateless HashingVectorizer, built with the classifier
 
     # ---------- Catalog ----------
     def load_action_catalog(self) -> List[Action]:
@@ -55,32 +123,78 @@ class RemediationAgent:
                 Action(id="rollback_deploy", text="Rollback last deployment"),
                 Action(id="scale_resources", text="Scale up compute resources"),
             ]
+        self._id_to_action = {a.id: a for a in self._catalog}
         return self._catalog
 
     # ---------- Supervised baseline ----------
+    def _classifier_cache_path(self) -> Optional[Path]:
+        """joblib file for the fitted baseline, keyed by catalog content and the
+        scikit-learn version (pickles do not carry across versions)."""
+        if not self.catalog_path.exists():
+            return None
+        sklearn_version = _sklearn()[0]
+        h = hashlib.blake2b(self.catalog_path.read_bytes(), digest_size=8)
+        h.update(sklearn_version.encode("utf-8"))
+        h.update(b"hashing-lr")  # model layout; bump when the features change
+        return self.catalog_path.parent / f"remediation_clf_{h.hexdigest()}.joblib"
+
     def _ensure_classifier(self):
         if self._clf is not None:
             return
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.pipeline import Pipeline
-        from sklearn.linear_model import LogisticRegression
+        _, HashingVectorizer, LogisticRegression = _sklearn()
+
+        # Hashing needs no fitted vocabulary, so only the classifier is trained
+        # and cached; transform is a C-level hash per token.
+        self._hv = HashingVectorizer(
+            n_features=2**14, ngram_range=(1, 2), alternate_sign=False, norm="l2"
+        )
+
+        joblib = _joblib()
+        cache_path = self._classifier_cache_path() if joblib is not None else None
+        if cache_path is not None and cache_path.exists():
+            try:
+                self._clf = joblib.load(cache_path)
+                self._set_linear_model(self._clf)
+                return
+            except Exception:
+                # Corrupt or incompatible cache; refit below
+                pass
 
         catalog = self.load_action_catalog()
         # Construct a toy training set by pairing catalog phrases to labels
         X = [a.text for a in catalog]
         y = [a.id for a in catalog]
-        clf = Pipeline(
-            [
-                ("tfidf", TfidfVectorizer(max_features=4096, ngram_range=(1, 2))),
-                ("lr", LogisticRegression(max_iter=1000)),
-            ]
-        )
+        clf = LogisticRegression(max_iter=1000)
         try:
-            clf.fit(X, y)
+            clf.fit(self._hv.transform(X), y)
         except Exception:
             # If scikit isn't fitted due to environment, keep a placeholder
-            pass
+            self._clf = clf
+            return
         self._clf = clf
+        self._set_linear_model(clf)
+        if cache_path is not None:
+            try:
+                joblib.dump(clf, cache_path, compress=3)
+            except Exception:
+                # Read-only data dir: the in-memory model still works
+                pass
+
+    def _set_linear_model(self, clf) -> None:
+        """Keep the fitted weights so ranking needs only X @ coef.T + intercept.
+
+        Softmax (and the binary sigmoid) preserve order, so logits rank classes
+        exactly like predict_proba does.
+        """
+        self._classes = list(clf.classes_)
+        coef = np.asarray(clf.coef_, dtype=np.float32)
+        intercept = np.asarray(clf.intercept_, dtype=np.float32)
+        if len(self._classes) == 2:
+            # Binary LR stores one row scoring class 1 against class 0
+            coef = np.vstack([np.zeros_like(coef), coef])
+            intercept = np.concatenate([np.zeros_like(intercept), intercept])
+        self._coef = coef
+        self._intercept = intercept
 
     def classify_actions(self, problem_text: str, top_k: int = 3) -> List[Action]:
         self._ensure_classifier()
@@ -89,13 +203,13 @@ class RemediationAgent:
             # Fallback: simple heuristic ordering
             return catalog[:top_k]
         try:
-            import numpy as np
-
-            proba = self._clf.predict_proba([problem_text])[0]
-            classes = list(self._clf.classes_)
-            idx = np.argsort(-proba)[:top_k]
-            id_set = {classes[i] for i in idx}
-            return [a for a in catalog if a.id in id_set][:top_k]
+            X = self._hv.transform([problem_text])
+            scores = np.asarray(X @ self._coef.T).ravel() + self._intercept
+            k = min(top_k, len(scores))
+            if k <= 0:
+                return []
+            idx = _argtopk()(scores, k)
+            return [self._id_to_action[self._classes[i]] for i in idx]
         except Exception:
             return catalog[:top_k]
 
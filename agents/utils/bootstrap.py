@@ -2,15 +2,52 @@ from __future__ import annotations
 import sys
 import types
 import re
+import importlib.abc
 import importlib.util
 from pathlib import Path
+from typing import Dict, Optional
 
 """Utilities for dynamically exposing the analyzer-helpers directory as the
 package name `analyzer_helpers` so imports work across modules.
 """
 
+_PKG_NAME = "analyzer_helpers"
+
+
+class _AnalyzerHelpersFinder(importlib.abc.MetaPathFinder):
+    """Resolve `analyzer_helpers.<name>` to a file in the helpers directory on
+    first import. Nothing is executed until a module is actually imported."""
+
+    def __init__(self, base: Path) -> None:
+        self.base = base
+        self._name_to_path: Optional[Dict[str, Path]] = None
+
+    def _names(self) -> Dict[str, Path]:
+        if self._name_to_path is None:
+            # Normalize filenames like cache-requests.py -> cache_requests
+            self._name_to_path = {
+                re.sub(r"[^0-9a-zA-Z_]", "_", py.stem): py
+                for py in self.base.glob("*.py")
+                if py.is_file()
+            }
+        return self._name_to_path
+
+    def find_spec(self, fullname, path=None, target=None):
+        prefix = _PKG_NAME + "."
+        if not fullname.startswith(prefix):
+            return None
+        short = fullname[len(prefix) :]
+        if "." in short:
+            return None
+        py = self._names().get(short)
+        if py is None:
+            return None
+        return importlib.util.spec_from_file_location(fullname, py)
+
 
 def bootstrap_analyzer_helpers(base_dir: Path) -> None:
+    if _PKG_NAME in sys.modules:
+        return
     candidates = [
         base_dir / "analyzer-helpers",
         base_dir.parent
@@ -26,26 +63,9 @@ def bootstrap_analyzer_helpers(base_dir: Path) -> None:
     if base is None:
         return
 
-    pkg_name = "analyzer_helpers"
-    if pkg_name not in sys.modules:
-        pkg = types.ModuleType(pkg_name)
-        pkg.__path__ = [str(base)]
-        pkg.__package__ = pkg_name
-        sys.modules[pkg_name] = pkg
-    else:
-        pkg = sys.modules[pkg_name]
-
-    for py in base.glob("*.py"):
-        if not py.is_file():
-            continue
-        stem = py.stem
-        mod_name = re.sub(r"[^0-9a-zA-Z_]", "_", stem)
-        fqmn = f"{pkg_name}.{mod_name}"
-        if fqmn in sys.modules:
-            continue
-        spec = importlib.util.spec_from_file_location(fqmn, py)
-        if spec and spec.loader:
-            mod = importlib.util.module_from_spec(spec)
-            sys.modules[fqmn] = mod
-            spec.loader.exec_module(mod)
-            setattr(pkg, mod_name, mod)
+    # Package shell only; submodules load lazily through the finder
+    pkg = types.ModuleType(_PKG_NAME)
+    pkg.__path__ = [str(base)]
+    pkg.__package__ = _PKG_NAME
+    sys.modules[_PKG_NAME] = pkg
+    sys.meta_path.insert(0, _AnalyzerHelpersFinder(base))
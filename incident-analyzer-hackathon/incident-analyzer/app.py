@@ -1,24 +1,327 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    jsonify,
+    stream_with_context,
+)
+import atexit
+import codecs
+import copy
+import functools
+import gzip
+import hashlib
+import importlib.util
+import io
 import time
 import csv
-import io
 import json
 import re
 import asyncio
 import urllib.request
 import os
 import sys
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 import sys
 
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 # Add the agents directory to the path to import orchestration_agent
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agents"))
 
 app = Flask(__name__)
 
-# Store the last analysis result for CSV download
-last_analysis_result = None
+
+# orjson encodes straight to UTF-8 bytes; stdlib json is the fallback
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    class _OrjsonProvider(DefaultJSONProvider):
+        """jsonify through orjson. Keys stay sorted as with Flask's provider."""
+
+        _OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default, option=self._OPTS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            body = orjson.dumps(
+                obj, default=self.default, option=self._OPTS | orjson.OPT_APPEND_NEWLINE
+            )
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+    app.json = _OrjsonProvider(app)
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+
+# Analysis results for CSV download, keyed by the result_id /analyze returns.
+# Bounded and expiring, so concurrent users each download their own report.
+_RESULTS_MAX = 1024
+_RESULTS_TTL = 3600.0
+_results_lock = threading.Lock()
+_results: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _store_result(results):
+    result_id = uuid.uuid4().hex
+    now = time.monotonic()
+    with _results_lock:
+        # Insertion order is expiry order, so expired entries sit at the front
+        while _results and next(iter(_results.values()))[0] < now:
+            _results.popitem(last=False)
+        _results[result_id] = (now + _RESULTS_TTL, results)
+        while len(_results) > _RESULTS_MAX:
+            _results.popitem(last=False)
+    return result_id
+
+
+def _get_result(result_id):
+    with _results_lock:
+        entry = _results.get(result_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _results[result_id]
+            return None
+        return entry[1]
+
+
+# Case-log lookup from the agents package; False until first use, None if unusable
+_cache_lookup = False
+_cache_lookup_lock = threading.Lock()
+
+
+def _get_cache_lookup():
+    """get_root_cause_for_incident from the agents' case-log cache, or None.
+
+    The first call also starts the background warmup of the vector DB model and
+    the CSV fallback, so early requests report misses instead of waiting on the
+    model load.
+    """
+    global _cache_lookup
+    with _cache_lookup_lock:
+        if _cache_lookup is False:
+            try:
+                from utils.bootstrap import bootstrap_analyzer_helpers
+
+                bootstrap_analyzer_helpers(
+                    Path(__file__).parent.parent.parent / "agents"
+                )
+                from analyzer_helpers import cache_requests
+
+                cache_requests.kick_warmup()
+                _cache_lookup = cache_requests.get_root_cause_for_incident
+            except Exception as e:
+                print(f"Warning: Case-log cache unavailable: {e}")
+                _cache_lookup = None
+        return _cache_lookup
+
+
+# After a lookup error that may clear up (a half-written CSV, a model that
+# failed to load), the case log is skipped for this long rather than reloaded
+# on every request
+_CACHE_RETRY_S = 60.0
+_cache_retry_at = 0.0
+
+
+def cached_root_cause(content: str):
+    """Root cause of a near-duplicate, already resolved incident, or None."""
+    global _cache_lookup, _cache_retry_at
+    lookup = _get_cache_lookup()
+    if lookup is None or time.monotonic() < _cache_retry_at:
+        return None
+    try:
+        return lookup(content)
+    except (ImportError, RuntimeError) as e:
+        # Missing model dependencies won't appear later: always use the LLM path
+        print(f"Warning: Case-log cache lookup failed, disabling it: {e}")
+        _cache_lookup = None
+        return None
+    except Exception as e:
+        # Anything else may pass later: retry after a pause
+        print(f"Warning: Case-log cache lookup failed, pausing it: {e}")
+        _cache_retry_at = time.monotonic() + _CACHE_RETRY_S
+        return None
+
+
+# One event loop for the app's async work, running on a daemon thread. Requests
+# submit coroutines to it instead of building a loop each, and the MCP client
+# connected on it stays open across requests.
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="app-event-loop", daemon=True
+            ).start()
+        return _loop
+
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+_mcp_client = None
+_mcp_lock = None  # asyncio.Lock, created on the shared loop
+
+
+async def _connected_mcp_client():
+    """The shared MCP client, connected on first use. Runs on the shared loop."""
+    global _mcp_client, _mcp_lock
+    if _mcp_lock is None:
+        _mcp_lock = asyncio.Lock()
+    async with _mcp_lock:
+        if _mcp_client is None:
+            client = get_mcp_client()
+            if client is None:
+                raise Exception("MCP client not available")
+            await client.__aenter__()
+            _mcp_client = client
+        return _mcp_client
+
+
+async def _reset_mcp_client():
+    global _mcp_client
+    client, _mcp_client = _mcp_client, None
+    _prompt_templates.clear()
+    if client is not None:
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+
+def _close_mcp():
+    if _mcp_client is not None and _loop is not None and _loop.is_running():
+        try:
+            run_async(_reset_mcp_client())
+        except Exception:
+            pass
+
+
+atexit.register(_close_mcp)
+
+
+# Upper bound on one chat completion; batched prompts can take a while
+API_TIMEOUT_S = 120.0
+
+# Azure calls go through one pooled httpx.AsyncClient on the shared loop when
+# httpx is installed (HTTP/2 if h2 is too); otherwise urllib on a worker thread.
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+_http = None
+
+
+def _get_http():
+    """The shared AsyncClient, created on first use. Runs on the shared loop."""
+    global _http
+    if _http is None:
+        # Failed connects are retried; requests that reached the API are not
+        transport = httpx.AsyncHTTPTransport(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            retries=2,
+        )
+        _http = httpx.AsyncClient(
+            transport=transport, timeout=httpx.Timeout(API_TIMEOUT_S, connect=10.0)
+        )
+    return _http
+
+
+def _close_http():
+    client = _http
+    if client is not None and _loop is not None and _loop.is_running():
+        try:
+            run_async(client.aclose())
+        except Exception:
+            pass
+
+
+atexit.register(_close_http)
+
+
+def _post_json(req) -> dict:
+    with urllib.request.urlopen(req, timeout=API_TIMEOUT_S) as response:
+        return _json_loads(response.read())
+
+
+# Request bodies are gzipped when AZURE_OPENAI_GZIP is set; the endpoint has to
+# accept Content-Encoding: gzip, and a 415 turns it off for the process. httpx
+# already asks for compressed responses and inflates them.
+_gzip_requests = os.getenv("AZURE_OPENAI_GZIP", "").lower() in {"1", "true", "yes"}
+_GZIP_MIN_BYTES = 1024
+
+
+async def _post_chat(hdr: dict, data: dict) -> dict:
+    """POST a chat completion and return the decoded response.
+
+    Failures raise urllib.error.HTTPError / URLError with either transport.
+    """
+    global _gzip_requests
+    body = _json_dumps(data)
+    if _gzip_requests and len(body) >= _GZIP_MIN_BYTES:
+        gz_hdr = {**hdr, "Content-Encoding": "gzip"}
+        try:
+            return await _post_body(gz_hdr, gzip.compress(body, compresslevel=1))
+        except urllib.error.HTTPError as e:
+            if e.code != 415:
+                raise
+            print("API rejected gzip request bodies; sending them uncompressed")
+            _gzip_requests = False
+    return await _post_body(hdr, body)
+
+
+async def _post_body(hdr: dict, body: bytes) -> dict:
+    if httpx is None:
+        req = urllib.request.Request(
+            AZURE_OPENAI_URL, headers=hdr, data=body, method="POST"
+        )
+        return await asyncio.to_thread(_post_json, req)
+    try:
+        resp = await _get_http().post(AZURE_OPENAI_URL, headers=hdr, content=body)
+    except httpx.TransportError as e:
+        raise urllib.error.URLError(e) from e
+    if resp.is_error:
+        raise urllib.error.HTTPError(
+            AZURE_OPENAI_URL,
+            resp.status_code,
+            resp.reason_phrase,
+            resp.headers,
+            io.BytesIO(resp.content),
+        )
+    return _json_loads(resp.content)
 
 
 def get_mcp_client():
@@ -36,47 +339,91 @@ def get_mcp_client():
         return None
 
 
-async def get_incident_analysis_prompt_from_mcp(incident_description: str) -> str:
-    """
-    Retrieves the incident analysis prompt from the MCP orchestration agent.
+_TEXT_REPR_PREFIXES = ("type='text' text='", 'type="text" text="')
+
+
+def _unwrap_text_repr(prompt_text: str) -> str:
+    """The text of a prompt message that came back as its repr
+    (type='text' text='...'): everything up to the first quote that is followed
+    by whitespace or the end. Unchanged if there is no such quote."""
+    body = prompt_text[len(_TEXT_REPR_PREFIXES[0]) :]
+    end = len(body)
+    i = 1
+    while i < end:
+        quotes = [j for j in (body.find("'", i), body.find('"', i)) if j >= 0]
+        if not quotes:
+            break
+        j = min(quotes)
+        if j + 1 == end or body[j + 1].isspace():
+            return body[:j]
+        i = j + 1
+    return prompt_text
+
+
+async def _fetch_prompt(name: str, arguments: dict) -> str:
+    """Render an MCP prompt and return its text.
+
+    A failed call drops the shared connection and is retried once on a new one.
     """
-    try:
-        client = get_mcp_client()
-        if client is None:
-            raise Exception("MCP client not available")
+    for attempt in range(2):
+        client = await _connected_mcp_client()
+        try:
+            prompt_result = await client.get_prompt(name, arguments)
+            break
+        except Exception:
+            await _reset_mcp_client()
+            if attempt:
+                raise
+    # Extract the text content from the prompt result
+    if hasattr(prompt_result, "messages") and len(prompt_result.messages) > 0:
+        content = prompt_result.messages[0].content
+        # TextContent carries the prompt as .text; its str() is the repr
+        text = getattr(content, "text", None)
+        if isinstance(text, str):
+            return text
+        prompt_text = str(content)
+        # Clean up the prompt text if it has extra formatting
+        if prompt_text.startswith(_TEXT_REPR_PREFIXES):
+            # Extract the actual text content
+            prompt_text = _unwrap_text_repr(prompt_text)
+        return prompt_text
+    else:
+        raise Exception("Invalid prompt structure")
 
-        async with client:
-            prompt_result = await client.get_prompt(
-                "incident_analysis_prompt",
-                {"incident_description": incident_description},
-            )
-            # Extract the text content from the prompt result
-            if hasattr(prompt_result, "messages") and len(prompt_result.messages) > 0:
-                prompt_text = str(prompt_result.messages[0].content)
-                # Clean up the prompt text if it has extra formatting
-                if prompt_text.startswith(
-                    "type='text' text='"
-                ) or prompt_text.startswith('type="text" text="'):
-                    # Extract the actual text content
-                    import re
-
-                    match = re.search(
-                        r"text=['\"](.+?)['\"](?:\s|$)", prompt_text, re.DOTALL
-                    )
-                    if match:
-                        prompt_text = match.group(1)
-                return prompt_text
-            else:
-                raise Exception("Invalid prompt structure")
-    except Exception as e:
-        print(f"Error getting prompt from MCP: {e}")
-        # Fallback to a default prompt if MCP is unavailable or errors
-        return f"""You are an expert incident response analyst. Analyze the following incident log or report and provide a structured response in JSON format. In a distinct paragraph, also give a systems thinking perspective easily explaining the problems and key causes and the plausible leverage points in a separate section in JSON format. Then also display the ASCII/UNICODE made feedback loops in JSON format.
+
+# MCP prompts are static text around their argument, so each is fetched with a
+# placeholder and split into (head, tail); requests then just splice in their
+# description. Templates are refetched after PROMPT_TTL_S so server-side edits
+# are picked up. A prompt whose text doesn't contain the placeholder exactly
+# once is cached as None and rendered by the server every time.
+PROMPT_TTL_S = 3600.0
+_PROMPT_SLOT = f"@@incident-description-{uuid.uuid4().hex}@@"
+_prompt_templates = {}  # name -> (expires, (head, tail) or None)
+
+
+async def _prompt_template(name: str, arg: str):
+    entry = _prompt_templates.get(name)
+    if entry is None or entry[0] < time.monotonic():
+        text = await _fetch_prompt(name, {arg: _PROMPT_SLOT})
+        parts = text.split(_PROMPT_SLOT)
+        template = tuple(parts) if len(parts) == 2 else None
+        entry = (time.monotonic() + PROMPT_TTL_S, template)
+        _prompt_templates[name] = entry
+    return entry[1]
+
+
+def invalidate_prompt_cache() -> None:
+    """Refetch MCP prompt templates on next use."""
+    _prompt_templates.clear()
+
+
+# Built-in prompt for when MCP is unavailable, split around the incident text
+_FALLBACK_HEAD, _FALLBACK_TAIL = """You are an expert incident response analyst. Analyze the following incident log or report and provide a structured response in JSON format. In a distinct paragraph, also give a systems thinking perspective easily explaining the problems and key causes and the plausible leverage points in a separate section in JSON format. Then also display the ASCII/UNICODE made feedback loops in JSON format.
 
 Incident Content:
 {incident_description}
 
-Provide your analysis in the following JSON format (return ONLY valid JSON, no other text):
+Provide your analysis in the following JSON format:
 {{
     "root_cause": "A detailed explanation of the root cause based on the incident data",
     "remediation_steps": [
@@ -103,21 +450,71 @@ Also include a top-level 'systems_thinking' field that contains a causal-loop st
 - Propose 2-3 leverage points
 - Optionally include a tiny ASCII causal-loop diagram
 
-Ensure the response is valid JSON only. The 'escalation_summary' field must contain the multi-line block shown above as a single string value, and 'systems_thinking' must be a string with the causal-loop analysis.
-"""
+The 'escalation_summary' field must contain the multi-line block shown above as a single string value, and 'systems_thinking' must be a string with the causal-loop analysis.
+""".format(
+    incident_description=_PROMPT_SLOT
+).split(_PROMPT_SLOT)
 
 
-async def analyze_incident_with_ai(content: str) -> dict:
-    """
-    Analyze incident content using OpenAI API, with the prompt retrieved from the MCP agent.
-    """
+async def _analysis_template():
+    """(head, tail) of the incident analysis prompt: from MCP, or the built-in
+    fallback if MCP is unavailable. None if MCP must render each incident."""
     try:
-        # Get the analysis prompt from the MCP orchestration agent
-        analysis_prompt_template = await get_incident_analysis_prompt_from_mcp(content)
+        return await _prompt_template(
+            "incident_analysis_prompt", "incident_description"
+        )
+    except Exception as e:
+        print(f"Error getting prompt from MCP: {e}")
+        return _FALLBACK_HEAD, _FALLBACK_TAIL
 
-        # Make sure we append an explicit instruction that enforces the escalation summary and systems-thinking format
-        # This ensures enforcement even if the MCP prompt doesn't contain the instruction.
-        enforcement_block = """
+
+async def get_incident_analysis_prompt_from_mcp(incident_description: str) -> str:
+    """
+    Retrieves the incident analysis prompt from the MCP orchestration agent.
+    """
+    template = await _analysis_template()
+    if template is None:
+        try:
+            return await _fetch_prompt(
+                "incident_analysis_prompt",
+                {"incident_description": incident_description},
+            )
+        except Exception as e:
+            print(f"Error getting prompt from MCP: {e}")
+            # Fallback to a default prompt if MCP is unavailable or errors
+            template = _FALLBACK_HEAD, _FALLBACK_TAIL
+    head, tail = template
+    return head + incident_description + tail
+
+
+DEFAULT_REMEDIATION_STEPS = (
+    "Review the incident logs in detail",
+    "Identify affected systems and services",
+    "Implement temporary mitigation measures",
+    "Deploy permanent fix or patch",
+    "Monitor system for recurrence",
+)
+
+
+def cached_analysis(cause: str) -> dict:
+    """Analysis result for an incident matched in the case log (no LLM call)."""
+    return {
+        "root_cause": cause,
+        "remediation_steps": list(DEFAULT_REMEDIATION_STEPS),
+        "escalation_summary": (
+            "Matched a previously resolved incident in the case log. "
+            f"Known root cause: {cause}"
+        ),
+        "ticket_status": "PROJ-AUTO",
+        "source": "case-log-cache",
+    }
+
+
+AZURE_OPENAI_URL = "https://psacodesprint2025.azure-api.net/openai/deployments/gpt-4.1-nano/chat/completions?api-version=2025-01-01-preview"
+
+# Make sure we append an explicit instruction that enforces the escalation summary and systems-thinking format
+# This ensures enforcement even if the MCP prompt doesn't contain the instruction.
+ENFORCEMENT_BLOCK = """
 
 ADDITIONAL REQUIREMENT: At the end of your JSON response include both:
 1) an 'escalation_summary' block in this exact format:
@@ -134,11 +531,250 @@ Summary: <one-paragraph, concise summary suitable for escalation>
 - 2-3 concrete leverage points
 - Optionally a tiny ASCII causal-loop diagram
 
-The entire output must be valid JSON only. 'escalation_summary' must be the multi-line block above as a single string value. 'systems_thinking' must be a string value with the causal-loop analysis.
+'escalation_summary' must be the multi-line block above as a single string value. 'systems_thinking' must be a string value with the causal-loop analysis.
 """
-        full_user_prompt = analysis_prompt_template + enforcement_block
 
-        url = "https://psacodesprint2025.azure-api.net/openai/deployments/gpt-4.1-nano/chat/completions?api-version=2025-01-01-preview"
+
+# Prompt tokens dominate API latency and cost. Incidents longer than
+# MAX_INCIDENT_CHARS keep their head and tail; the middle of a long log is
+# mostly repetition.
+MAX_INCIDENT_CHARS = 8000
+_INCIDENT_HEAD_CHARS = 6000
+_TRUNCATION_MARK = "\n...[truncated]...\n"
+
+# Phrases that show a prompt already carries the ENFORCEMENT_BLOCK rules, as the
+# built-in fallback prompt does
+_FORMAT_RULE_MARKERS = ("Details about the Incident Report", "'systems_thinking'")
+
+
+def trim_incident(content: str) -> str:
+    if len(content) <= MAX_INCIDENT_CHARS:
+        return content
+    tail = MAX_INCIDENT_CHARS - _INCIDENT_HEAD_CHARS
+    return content[:_INCIDENT_HEAD_CHARS] + _TRUNCATION_MARK + content[-tail:]
+
+
+async def build_analysis_prompt(content: str) -> str:
+    """User prompt for one incident: the MCP analysis prompt plus the format rules."""
+    content = trim_incident(content)
+    # Get the analysis prompt from the MCP orchestration agent
+    analysis_prompt_template = await get_incident_analysis_prompt_from_mcp(content)
+    instructions = analysis_prompt_template.replace(content, "", 1)
+    if all(m in instructions for m in _FORMAT_RULE_MARKERS):
+        return analysis_prompt_template
+    return analysis_prompt_template + ENFORCEMENT_BLOCK
+
+
+# Providers cache identical prompt prefixes, so requests put everything that is
+# the same for every incident first (system prompt, then the analysis
+# instructions) and the incident itself in the last message.
+SYSTEM_PROMPT = (
+    "You are an expert incident response analyst. Always respond with valid JSON only."
+)
+_INCIDENT_REF = "[the incident content is given in the next message]"
+_BATCH_FORMAT = (
+    "Respond with one JSON object of the form "
+    '{"results": [{"id": <request number>, ...}, ...]} where each item is the '
+    'JSON object asked for, plus its request number as "id".'
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _analysis_instructions(head: str, tail: str) -> str:
+    """The analysis prompt with the incident moved out, plus the format rules."""
+    text = head + _INCIDENT_REF + tail
+    if all(m in text for m in _FORMAT_RULE_MARKERS):
+        return text
+    return text + ENFORCEMENT_BLOCK
+
+
+def _incident_message(content: str) -> str:
+    return "Incident Content:\n" + trim_incident(content)
+
+
+async def build_analysis_messages(content: str) -> list:
+    """User messages for one incident: the shared instructions, then the incident.
+
+    A single server-rendered prompt is used if the MCP prompt can't be templated.
+    """
+    template = await _analysis_template()
+    if template is None:
+        return [await build_analysis_prompt(content)]
+    return [_analysis_instructions(*template), _incident_message(content)]
+
+
+async def build_batch_messages(contents) -> list:
+    """User messages asking for several incidents in one combined answer."""
+    n = len(contents)
+    template = await _analysis_template()
+    if template is None:
+        prompts = await asyncio.gather(*(build_analysis_prompt(c) for c in contents))
+        parts = [f"### Incident request {i}\n{p}" for i, p in enumerate(prompts)]
+        header = (
+            f"Handle each of the following {n} incident requests independently. "
+            "Each asks for a JSON object. " + _BATCH_FORMAT
+        )
+        return [header + "\n\n" + "\n\n".join(parts)]
+    parts = [
+        f"### Incident request {i}\n{_incident_message(c)}"
+        for i, c in enumerate(contents)
+    ]
+    header = (
+        f"Apply the instructions above to each of the following {n} incident "
+        "requests independently. " + _BATCH_FORMAT
+    )
+    return [
+        _analysis_instructions(*template),
+        header + "\n\n" + "\n\n".join(parts),
+    ]
+
+
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+@functools.lru_cache(maxsize=4)
+def _api_headers(api_key: str) -> dict:
+    # Shared across calls; the HTTP clients copy headers, never mutate them
+    return {
+        "Content-Type": "application/json",
+        "api-key": api_key,
+        "Cache-Control": "no-cache",
+    }
+
+
+# JSON mode: the reply is always one syntactically valid JSON object
+_JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+# With AZURE_OPENAI_JSON_SCHEMA set, replies are also held to the analysis
+# schema (structured outputs; the deployment and api-version must support it),
+# so every field is present and typed. Strict mode needs every property required
+# and no extras.
+_json_schema_mode = os.getenv("AZURE_OPENAI_JSON_SCHEMA", "").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+_ANALYSIS_FIELDS = {
+    "root_cause": {"type": "string"},
+    "remediation_steps": {"type": "array", "items": {"type": "string"}},
+    "escalation_summary": {"type": "string"},
+    "systems_thinking": {"type": "string"},
+    "ticket_status": {"type": "string"},
+}
+
+
+def _object_schema(properties: dict) -> dict:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+_ANALYSIS_SCHEMA = _object_schema(_ANALYSIS_FIELDS)
+_SCHEMA_FORMATS = {
+    False: {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "incident_analysis",
+            "strict": True,
+            "schema": _ANALYSIS_SCHEMA,
+        },
+    },
+    True: {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "incident_analyses",
+            "strict": True,
+            "schema": _object_schema(
+                {
+                    "results": {
+                        "type": "array",
+                        "items": _object_schema(
+                            {"id": {"type": "integer"}, **_ANALYSIS_FIELDS}
+                        ),
+                    }
+                }
+            ),
+        },
+    },
+}
+
+
+def _chat_request(
+    user_messages: list, api_key: str, max_tokens: int = 1500, batch: bool = False
+):
+    """Headers and body for one chat completion, for _post_chat.
+
+    batch selects the {"results": [...]} schema of build_batch_messages.
+    """
+    hdr = _api_headers(api_key)
+    messages = [_SYSTEM_MESSAGE]
+    messages += [{"role": "user", "content": m} for m in user_messages]
+    data = {
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "response_format": (
+            _SCHEMA_FORMATS[batch] if _json_schema_mode else _JSON_OBJECT_FORMAT
+        ),
+    }
+    return hdr, data
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def parse_json_response(text: str):
+    """Parse the JSON object in a model response.
+
+    Requests use JSON (or JSON-schema) mode, so replies parse directly.
+    Otherwise the object starting at the first "{" is decoded in one pass
+    (raw_decode stops at its closing brace, ignoring trailing prose), and as a
+    last resort the span up to the last "}" is tried. Raises json.JSONDecodeError if nothing parses.
+    """
+    try:
+        return _json_loads(text)
+    except json.JSONDecodeError as e:
+        err = e
+    start = text.find("{")
+    if start < 0:
+        raise err
+    try:
+        return _JSON_DECODER.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
+    end = text.rfind("}")
+    if end <= start:
+        raise err
+    return _json_loads(text[start : end + 1])
+
+
+def ensure_analysis_fields(analysis_result: dict) -> dict:
+    """Fill in any required field the model left out."""
+    if "root_cause" not in analysis_result:
+        analysis_result["root_cause"] = (
+            "Unable to determine root cause from the provided incident data."
+        )
+    if "remediation_steps" not in analysis_result:
+        analysis_result["remediation_steps"] = list(DEFAULT_REMEDIATION_STEPS)
+    if "escalation_summary" not in analysis_result:
+        analysis_result["escalation_summary"] = (
+            "Incident analysis completed. See root cause and remediation steps above."
+        )
+    if "ticket_status" not in analysis_result:
+        analysis_result["ticket_status"] = "PROJ-AUTO"
+
+    return analysis_result
+
+
+async def analyze_incident_with_ai(content: str) -> dict:
+    """
+    Analyze incident content using OpenAI API, with the prompt retrieved from the MCP agent.
+    """
+    try:
+        user_messages = await build_analysis_messages(content)
 
         api_key = os.getenv("AZURE_OPENAI_API_KEY", "")
         if not api_key:
@@ -150,31 +786,11 @@ The entire output must be valid JSON only. 'escalation_summary' must be the mult
                 "ticket_status": "PROJ-CONFIG-ERROR",
             }
 
-        hdr = {
-            "Content-Type": "application/json",
-            "api-key": api_key,
-            "Cache-Control": "no-cache",
-        }
-
-        data = {
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are an expert incident response analyst. Always respond with valid JSON only.",
-                },
-                {"role": "user", "content": full_user_prompt},
-            ],
-            "temperature": 0.7,
-            "max_tokens": 1500,
-        }
-
-        data_json = json.dumps(data)
-        req = urllib.request.Request(url, headers=hdr, data=data_json.encode("utf-8"))
-        req.get_method = lambda: "POST"
+        hdr, data = _chat_request(user_messages, api_key)
 
         try:
-            response = urllib.request.urlopen(req)
-            response_data = json.loads(response.read().decode("utf-8"))
+            # Awaited on the shared loop, so other requests proceed meanwhile
+            response_data = await _post_chat(hdr, data)
             response_text = response_data["choices"][0]["message"]["content"].strip()
         except urllib.error.HTTPError as http_err:
             error_body = (
@@ -223,13 +839,8 @@ The entire output must be valid JSON only. 'escalation_summary' must be the mult
                 "ticket_status": "PROJ-EMPTY-RESPONSE",
             }
 
-        # Try to extract JSON from response
-        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if json_match:
-            response_text = json_match.group(0)
-
         try:
-            analysis_result = json.loads(response_text)
+            analysis_result = parse_json_response(response_text)
         except json.JSONDecodeError as json_err:
             print(f"JSON parsing error: {json_err}")
             print(f"Response text was: {response_text[:500]}")
@@ -246,27 +857,7 @@ The entire output must be valid JSON only. 'escalation_summary' must be the mult
                 "ticket_status": "PROJ-JSON-ERROR",
             }
 
-        # Ensure all required fields are present
-        if "root_cause" not in analysis_result:
-            analysis_result["root_cause"] = (
-                "Unable to determine root cause from the provided incident data."
-            )
-        if "remediation_steps" not in analysis_result:
-            analysis_result["remediation_steps"] = [
-                "Review the incident logs in detail",
-                "Identify affected systems and services",
-                "Implement temporary mitigation measures",
-                "Deploy permanent fix or patch",
-                "Monitor system for recurrence",
-            ]
-        if "escalation_summary" not in analysis_result:
-            analysis_result["escalation_summary"] = (
-                "Incident analysis completed. See root cause and remediation steps above."
-            )
-        if "ticket_status" not in analysis_result:
-            analysis_result["ticket_status"] = "PROJ-AUTO"
-
-        return analysis_result
+        return ensure_analysis_fields(analysis_result)
 
     except KeyError as key_err:
         print(f"KeyError in API response: {key_err}")
@@ -301,19 +892,235 @@ The entire output must be valid JSON only. 'escalation_summary' must be the mult
         }
 
 
+# Micro-batching: /analyze requests that miss the case-log cache and arrive
+# within BATCH_WINDOW_S of each other share one chat completion (up to
+# MAX_BATCH incidents); MAX_INFLIGHT caps concurrent calls to the API.
+# Batching is off unless ANALYZE_MAX_BATCH > 1: a shared prompt shows each
+# user's incident to the model next to other users' text, which can steer it.
+BATCH_WINDOW_S = 0.05
+MAX_BATCH = max(1, int(os.getenv("ANALYZE_MAX_BATCH", "1")))
+MAX_INFLIGHT = 8
+_batch_queue = None  # asyncio.Queue, created on the shared loop
+# The loop only keeps weak references to tasks; these keep them alive until done
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+# Successful analyses by deployment and content hash, so retries of an identical
+# incident skip the API call; entries expire after _ANALYSIS_CACHE_TTL seconds.
+# Error results (these ticket statuses) are never cached.
+_ANALYSIS_CACHE_MAX = 256
+_ANALYSIS_CACHE_TTL = 600.0
+_analysis_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_ERROR_TICKETS = frozenset(
+    {
+        "PROJ-CONFIG-ERROR",
+        "PROJ-API-ERROR",
+        "PROJ-NETWORK-ERROR",
+        "PROJ-EMPTY-RESPONSE",
+        "PROJ-JSON-ERROR",
+        "PROJ-FORMAT-ERROR",
+        "PROJ-FAILED",
+    }
+)
+
+
+async def analyze_incident_batched(content: str) -> dict:
+    """analyze_incident_with_ai, coalesced with concurrent requests and memoized
+    by content. Runs on the shared loop; callers get their own copy."""
+    h = hashlib.blake2b(AZURE_OPENAI_URL.encode("utf-8"), digest_size=16)
+    h.update(b"\0" + content.encode("utf-8"))
+    key = h.hexdigest()
+    entry = _analysis_cache.get(key)
+    if entry is not None:
+        if entry[0] >= time.monotonic():
+            _analysis_cache.move_to_end(key)
+            print("Analysis cache hit, API call skipped")
+            return copy.deepcopy(entry[1])
+        del _analysis_cache[key]
+    result = await _analyze_batched(content)
+    if result.get("ticket_status") not in _ERROR_TICKETS:
+        expires = time.monotonic() + _ANALYSIS_CACHE_TTL
+        _analysis_cache[key] = (expires, copy.deepcopy(result))
+        if len(_analysis_cache) > _ANALYSIS_CACHE_MAX:
+            _analysis_cache.popitem(last=False)
+    return result
+
+
+async def _analyze_batched(content: str) -> dict:
+    global _batch_queue
+    if _batch_queue is None:
+        _batch_queue = asyncio.Queue()
+        _spawn(_batch_worker(_batch_queue))
+    fut = asyncio.get_running_loop().create_future()
+    await _batch_queue.put((content, fut))
+    return await fut
+
+
+async def _batch_worker(queue):
+    loop = asyncio.get_running_loop()
+    inflight = asyncio.Semaphore(MAX_INFLIGHT)
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + BATCH_WINDOW_S
+        while len(batch) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        _spawn(_run_batch(batch, inflight))
+
+
+async def _run_batch(batch, inflight):
+    contents = [content for content, _ in batch]
+    async with inflight:
+        try:
+            if len(batch) == 1:
+                results = [await analyze_incident_with_ai(contents[0])]
+            else:
+                results = await _analyze_many(contents)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+    for (_, fut), result in zip(batch, results):
+        if not fut.done():
+            fut.set_result(result)
+
+
+async def _analyze_many(contents):
+    """Analyze several incidents with one chat completion.
+
+    Incidents missing from the combined answer, or every incident if the call
+    or parsing fails, fall back to one analyze_incident_with_ai call each.
+    """
+    api_key = os.getenv("AZURE_OPENAI_API_KEY", "")
+    results = [None] * len(contents)
+    if api_key:
+        user_messages = await build_batch_messages(contents)
+        hdr, data = _chat_request(
+            user_messages, api_key, max_tokens=1500 * len(contents), batch=True
+        )
+        try:
+            response_data = await _post_chat(hdr, data)
+            response_text = response_data["choices"][0]["message"]["content"].strip()
+            items = parse_json_response(response_text)
+            for item in items.get("results", []):
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    i = int(item.pop("id"))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if 0 <= i < len(results):
+                    results[i] = ensure_analysis_fields(item)
+        except Exception as e:
+            print(f"Batched analysis failed, analyzing one by one: {e}")
+    missing = [i for i, r in enumerate(results) if r is None]
+    singles = await asyncio.gather(
+        *(analyze_incident_with_ai(contents[i]) for i in missing)
+    )
+    for i, result in zip(missing, singles):
+        results[i] = result
+    return results
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
 
+# Second-resolution timestamps, formatted once per second per format
+_stamps = {}
+
+
+def _now_str(fmt: str) -> str:
+    second = int(time.time())
+    cached = _stamps.get(fmt)
+    if cached is None or cached[0] != second:
+        cached = (second, datetime.fromtimestamp(second).strftime(fmt))
+        _stamps[fmt] = cached
+    return cached[1]
+
+
+# Uploads are decoded in chunks as they are read, so a binary file fails on its
+# first bad chunk and an oversized one stops at the cap. Prompts only keep
+# MAX_INCIDENT_CHARS of it anyway.
+MAX_UPLOAD_BYTES = 1 << 20
+_UPLOAD_CHUNK = 1 << 16
+# Bodies declaring more than this (the cap plus room for form fields) get a 413
+# before the form is parsed
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES + (1 << 16)
+_MIN_CONTENT_CHARS = 10
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify(
+        {"error": f"Request is larger than {MAX_UPLOAD_BYTES // 1024} KB"}
+    ), 413
+
+
+# Control characters other than tab/newline/CR, and the replacement character
+_GARBAGE_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\ufffd]")
+
+
+def _reject_reason(content: str):
+    """Why content can't be a real incident report, or None. Checked before any
+    API call: a near-constant string or mostly binary data costs a full LLM
+    round-trip for a useless answer."""
+    if len(set(content)) < 5:
+        return "Incident content must be readable text"
+    if len(_GARBAGE_CHARS_RE.findall(content)) * 100 > len(content):
+        return "Incident content contains binary or unreadable data"
+    return None
+
+
+def _too_short(content: str) -> bool:
+    """len(content.strip()) < _MIN_CONTENT_CHARS, without copying long content."""
+    # Enough non-blank text at the start already decides it
+    if len(content[:64].strip()) >= _MIN_CONTENT_CHARS:
+        return False
+    return len(content.strip()) < _MIN_CONTENT_CHARS
+
+
+def _read_upload(stream) -> str:
+    """Decode an uploaded file as UTF-8.
+
+    Raises UnicodeDecodeError for non-UTF-8 data and ValueError past
+    MAX_UPLOAD_BYTES.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    size = 0
+    while True:
+        chunk = stream.read(_UPLOAD_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise ValueError(f"File is larger than {MAX_UPLOAD_BYTES // 1024} KB")
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
 @app.route("/analyze", methods=["POST"])
 def analyze():
     """
     Analyze endpoint that accepts either file upload or text input.
     Now integrated with OpenAI for real, dynamic incident analysis, using prompt from MCP agent.
     """
-    global last_analysis_result
-
     content = None
     source_name = None
 
@@ -321,30 +1128,41 @@ def analyze():
         file = request.files["file"]
         source_name = file.filename
         try:
-            content = file.read().decode("utf-8")
+            content = _read_upload(file.stream)
         except UnicodeDecodeError:
             return jsonify(
                 {"error": "File must be a valid text file (UTF-8 encoded)"}
             ), 400
-    elif "text" in request.form and request.form["text"].strip():
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 413
+    elif request.form.get("text", "") and not request.form["text"].isspace():
         content = request.form["text"]
         source_name = "Text Input"
     else:
         return jsonify({"error": "No file or text provided"}), 400
 
-    if len(content.strip()) < 10:
+    if _too_short(content):
         return jsonify(
             {"error": "Incident content must be at least 10 characters long"}
         ), 400
 
+    rejection = _reject_reason(content)
+    if rejection:
+        return jsonify({"error": rejection}), 400
+
     try:
-        # Run the async analysis function
-        analysis_results = asyncio.run(analyze_incident_with_ai(content))
+        # Near-duplicates of resolved incidents are answered from the case log;
+        # everything else goes to the LLM backend.
+        cause = cached_root_cause(content)
+        if cause:
+            analysis_results = cached_analysis(cause)
+        else:
+            analysis_results = run_async(analyze_incident_batched(content))
 
         analysis_results["filename"] = source_name
-        analysis_results["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        analysis_results["timestamp"] = _now_str("%Y-%m-%d %H:%M:%S")
 
-        last_analysis_result = analysis_results
+        analysis_results["result_id"] = _store_result(analysis_results)
 
         return jsonify(analysis_results)
 
@@ -353,54 +1171,83 @@ def analyze():
         return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
 
-@app.route("/download-csv", methods=["GET"])
-def download_csv():
-    """
-    Generate and download a CSV file with the analysis results.
-    """
-    global last_analysis_result
+class _CsvSink:
+    """File-like sink for csv.writer that collects formatted rows until take()."""
 
-    if not last_analysis_result:
-        return jsonify({"error": "No analysis results available"}), 400
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow(["Incident Analysis Report"])
-    writer.writerow(["Generated:", last_analysis_result.get("timestamp", "N/A")])
-    writer.writerow(["Source:", last_analysis_result.get("filename", "N/A")])
-    writer.writerow([])
-
-    writer.writerow(["Root Cause Analysis"])
-    writer.writerow([last_analysis_result.get("root_cause", "")])
-    writer.writerow([])
-
-    writer.writerow(["Remediation Steps"])
-    for i, step in enumerate(last_analysis_result.get("remediation_steps", []), 1):
-        writer.writerow([f"{i}. {step}"])
-    writer.writerow([])
-
-    writer.writerow(["Escalation Summary"])
-    for line in last_analysis_result.get("escalation_summary", "").split("\n"):
-        writer.writerow([line])
-    writer.writerow([])
-
-    writer.writerow(["Ticket Status"])
-    writer.writerow(
-        [
-            f"Ticket {last_analysis_result.get('ticket_status', 'N/A')} created successfully."
-        ]
-    )
+    def take(self) -> bytes:
+        data = "".join(self.parts).encode("utf-8")
+        self.parts.clear()
+        return data
+
+
+def _csv_bytes(*rows) -> bytes:
+    sink = _CsvSink()
+    csv.writer(sink).writerows(rows)
+    return sink.take()
+
+
+# Constant report sections, serialized once; each starts with its blank separator
+_CSV_TITLE = _csv_bytes(["Incident Analysis Report"])
+_CSV_ROOT_CAUSE = _csv_bytes([], ["Root Cause Analysis"])
+_CSV_REMEDIATION = _csv_bytes([], ["Remediation Steps"])
+_CSV_SUMMARY = _csv_bytes([], ["Escalation Summary"])
+_CSV_TICKET = _csv_bytes([], ["Ticket Status"])
 
-    output.seek(0)
-    bytes_output = io.BytesIO()
-    bytes_output.write(output.getvalue().encode("utf-8"))
-    bytes_output.seek(0)
 
-    filename = f"incident_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+def _iter_lines(text: str):
+    """The pieces of text.split("\n"), yielded one at a time without the list."""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
 
-    return send_file(
-        bytes_output, mimetype="text/csv", as_attachment=True, download_name=filename
+
+@app.route("/download-csv", methods=["GET"])
+@app.route("/download-csv/<result_id>", methods=["GET"])
+def download_csv(result_id=None):
+    """
+    Generate and download a CSV file with the analysis results identified by
+    result_id (path segment or ?id= query parameter).
+    """
+    result_id = result_id or request.args.get("id", "")
+    result = _get_result(result_id)
+    if not result:
+        return jsonify({"error": "No analysis results available"}), 400
+
+    # One chunk per report section: its constant header plus its rows, written
+    # with writerows
+    def generate():
+        sink = _CsvSink()
+        writer = csv.writer(sink)
+        writer.writerow(("Generated:", result.get("timestamp", "N/A")))
+        writer.writerow(("Source:", result.get("filename", "N/A")))
+        yield _CSV_TITLE + sink.take()
+        writer.writerow((result.get("root_cause", ""),))
+        yield _CSV_ROOT_CAUSE + sink.take()
+        steps = result.get("remediation_steps", [])
+        writer.writerows((f"{i}. {step}",) for i, step in enumerate(steps, 1))
+        yield _CSV_REMEDIATION + sink.take()
+        summary = result.get("escalation_summary", "")
+        writer.writerows((line,) for line in _iter_lines(summary))
+        yield _CSV_SUMMARY + sink.take()
+        ticket = result.get("ticket_status", "N/A")
+        writer.writerow((f"Ticket {ticket} created successfully.",))
+        yield _CSV_TICKET + sink.take()
+
+    filename = f"incident_analysis_{_now_str('%Y%m%d_%H%M%S')}.csv"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
@@ -415,5 +1262,30 @@ def health():
     )
 
 
+def warm_up():
+    """Do the slow first-request setup before serving (also used by wsgi.py)."""
+    # Start loading the case-log cache before the first request arrives
+    _get_cache_lookup()
+    # Connect to the MCP server up front rather than on the first request
+    try:
+        run_async(_connected_mcp_client())
+    except Exception as e:
+        print(f"Warning: MCP connection deferred: {e}")
+
+
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    warm_up()
+    # One process on purpose: result ids, caches, the MCP session and the event
+    # loop are per process. Requests are served on threads while LLM calls wait
+    # on the shared loop, so a thread is only busy for the request's own work.
+    port = int(os.getenv("PORT", "5000"))
+    if os.getenv("FLASK_DEBUG", "").lower() in {"1", "true", "yes"}:
+        app.run(debug=True, host="0.0.0.0", port=port, use_reloader=False)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            app.run(host="0.0.0.0", port=port, threaded=True)
+        else:
+            threads = int(os.getenv("APP_THREADS", "32"))
+            serve(app, host="0.0.0.0", port=port, threads=threads)
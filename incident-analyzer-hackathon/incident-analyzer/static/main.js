@@ -15,6 +15,9 @@ const themeToggle = document.getElementById('theme-toggle');
 const sunIcon = document.getElementById('sun-icon');
 const moonIcon = document.getElementById('moon-icon');
 
+// Id of the displayed analysis, used to download its CSV
+let currentResultId = null;
+
 // Voice-to-text and autocomplete variables
 let isListening = false;
 const SpeechRecognition = window.SpeechRecognition || window.webkitSpeechRecognition;
@@ -378,6 +381,8 @@ function displayResults(data) {
         resultsSection.style.animation = 'fadeInUp 0.4s ease-out';
     }, 300);
     
+    currentResultId = data.result_id;
+
     // Populate root cause
     document.getElementById('root-cause-text').textContent = data.root_cause;
     
@@ -405,7 +410,7 @@ function displayResults(data) {
 // Download CSV button handler
 downloadCsvBtn.addEventListener('click', async () => {
     try {
-        const response = await fetch('/download-csv');
+        const response = await fetch(`/download-csv/${encodeURIComponent(currentResultId)}`);
         
         if (!response.ok) {
             throw new Error('Download failed');
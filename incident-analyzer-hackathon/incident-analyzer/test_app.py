@@ -4,6 +4,7 @@ Test script for the Flask incident analyzer application.
 This tests the API without needing the Azure OpenAI key.
 """
 
+import io
 import sys
 from pathlib import Path
 
@@ -87,7 +88,42 @@ def test_analyze_endpoint_validation():
             else:
                 print(f"✗ Analyze endpoint should return 400 for short input, got {response.status_code}")
                 return False
-            
+
+            # Test with fewer than 5 distinct characters
+            response = client.post('/analyze', data={'text': 'abab' * 50})
+            if response.status_code == 400:
+                print(f"✓ Analyze endpoint correctly rejects near-constant input")
+            else:
+                print(f"✗ Analyze endpoint should return 400 for near-constant input, got {response.status_code}")
+                return False
+
+            # Test with more than 1% control characters
+            text = 'Database connection timeout on node7 ' * 5 + '\x01' * 10
+            response = client.post('/analyze', data={'text': text})
+            if response.status_code == 400:
+                print(f"✓ Analyze endpoint correctly rejects binary input")
+            else:
+                print(f"✗ Analyze endpoint should return 400 for binary input, got {response.status_code}")
+                return False
+
+            # Test with a non-UTF-8 upload
+            data = {'file': (io.BytesIO(b'Disk full on node7 \xff\xfe\xfa'), 'incident.log')}
+            response = client.post('/analyze', data=data, content_type='multipart/form-data')
+            if response.status_code == 400:
+                print(f"✓ Analyze endpoint correctly rejects non-UTF-8 upload")
+            else:
+                print(f"✗ Analyze endpoint should return 400 for non-UTF-8 upload, got {response.status_code}")
+                return False
+
+            # Test with an upload over the size limit
+            data = {'file': (io.BytesIO(b'x' * (app.MAX_UPLOAD_BYTES + 1)), 'incident.log')}
+            response = client.post('/analyze', data=data, content_type='multipart/form-data')
+            if response.status_code == 413:
+                print(f"✓ Analyze endpoint correctly rejects oversize upload")
+            else:
+                print(f"✗ Analyze endpoint should return 413 for oversize upload, got {response.status_code}")
+                return False
+
             return True
     except Exception as e:
         print(f"\n✗ Analyze endpoint validation test failed: {e}")
@@ -95,6 +131,63 @@ def test_analyze_endpoint_validation():
         traceback.print_exc()
         return False
 
+def test_download_csv_endpoint():
+    """Test /analyze -> /download-csv/<result_id> with the analysis stubbed."""
+    try:
+        import app
+
+        async def fake_analysis(content):
+            return {
+                "root_cause": "Disk filled up on node7",
+                "remediation_steps": ["Rotate logs", "Expand the volume"],
+                "escalation_summary": "Summary line 1\nSummary line 2",
+                "systems_thinking": "",
+                "ticket_status": "PROJ-TEST",
+            }
+
+        saved = app.analyze_incident_batched, app.cached_root_cause
+        app.analyze_incident_batched = fake_analysis
+        app.cached_root_cause = lambda content: None
+        try:
+            with app.app.test_client() as client:
+                text = 'Disk usage alert: /var on node7 reached 100% at 02:00'
+                response = client.post('/analyze', data={'text': text})
+                if response.status_code != 200:
+                    print(f"\n✗ Analyze with stubbed analysis returned {response.status_code}")
+                    return False
+                result_id = response.get_json()["result_id"]
+
+                response = client.get(f'/download-csv/{result_id}')
+                body = response.get_data(as_text=True)
+                if response.status_code == 200 and "Disk filled up on node7" in body and "2. Expand the volume" in body:
+                    print(f"\n✓ CSV download returns the stored analysis")
+                else:
+                    print(f"\n✗ CSV download for a stored result failed: {response.status_code}")
+                    return False
+
+                response = client.get('/download-csv')
+                if response.status_code == 400:
+                    print(f"✓ CSV download correctly rejects a missing result id")
+                else:
+                    print(f"✗ CSV download should return 400 without a result id, got {response.status_code}")
+                    return False
+
+                response = client.get('/download-csv/unknown-id')
+                if response.status_code == 400:
+                    print(f"✓ CSV download correctly rejects an unknown result id")
+                else:
+                    print(f"✗ CSV download should return 400 for an unknown result id, got {response.status_code}")
+                    return False
+        finally:
+            app.analyze_incident_batched, app.cached_root_cause = saved
+
+        return True
+    except Exception as e:
+        print(f"\n✗ CSV download test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def test_mcp_integration():
     """Test MCP integration."""
     try:
@@ -123,6 +216,7 @@ def main():
         ("Routes Registration", test_routes_registered),
         ("Health Endpoint", test_health_endpoint),
         ("Analyze Endpoint Validation", test_analyze_endpoint_validation),
+        ("CSV Download", test_download_csv_endpoint),
         ("MCP Integration", test_mcp_integration),
     ]
     
@@ -0,0 +1,13 @@
+"""WSGI entry point for running the app under an external server, e.g.
+
+    gunicorn -w 1 -k gthread --threads 32 -b 0.0.0.0:5000 wsgi:app
+
+Keep a single worker process: result ids, caches, the MCP session and the event
+loop live in the process, so a second worker would not find another's results.
+Scale with threads instead, and skip --preload: the event loop thread started
+here would not survive the fork into the worker.
+"""
+
+from app import app, warm_up  # noqa: F401
+
+warm_up()
@@ -1,8 +1,11 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from agents.knowledge_base_ingest import index_kb_pdfs
 from agents.utils.bootstrap import bootstrap_analyzer_helpers
 
+_AGENTS_DIR = Path(__file__).resolve().parents[1] / "agents"
+
 
 def cli():  # pragma: no cover
     import argparse
@@ -11,14 +14,25 @@ def cli():  # pragma: no cover
     p.add_argument("--csv", type=Path, required=True)
     p.add_argument("--kb", type=Path, default=Path("knowledge_base"))
     args = p.parse_args()
-    # Expose analyzer-helpers as package 'analyzer_helpers'
-    from pathlib import Path as _P
-
-    bootstrap_analyzer_helpers(_P(__file__).resolve().parents[1] / "agents")
+    # Expose analyzer-helpers as package 'analyzer_helpers' (a no-op once done);
+    # build_vector_db stays a lazy import so importing this module doesn't load
+    # torch/chromadb
+    bootstrap_analyzer_helpers(_AGENTS_DIR)
+    from analyzer_helpers import vector_db_utils as vdb  # type: ignore
     from analyzer_helpers.build_vector_db import main as build_vdb  # type: ignore
 
-    build_vdb(args.csv)
-    index_kb_pdfs(args.kb)
+    # Open the Chroma client and load the model here, before either build starts,
+    # so both threads use the same copies instead of racing to create them.
+    vdb.get_client()
+    vdb.warmup(collection_names=())
+    # The two builds are independent. Threads rather than processes: both write
+    # through the one process-wide Chroma client (a persistent store must not be
+    # opened by two processes), and the heavy parts already run outside the GIL
+    # (torch encoding, the spawned PDF extraction processes).
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futures = [ex.submit(build_vdb, args.csv), ex.submit(index_kb_pdfs, args.kb)]
+        for fut in futures:
+            fut.result()
 
 
 if __name__ == "__main__":